@@ -1,26 +1,43 @@
+from typing import NamedTuple
+
+
+class GroupMeta(NamedTuple):
+    """
+    Static metadata of a tracked Telegram group/channel.
+
+    Attributes:
+        group_name (str): Display name of the group/channel.
+        language (str): The language the group posts in.
+        type (str): The side/category the group belongs to (e.g., "Israeli news").
+    """
+    group_name: str
+    language: str
+    type: str
+
+
 TELEGRAM_GROUPS_MAP = {
     # The Israeli side groups
-    'idf_telegram': {'group_name': 'IDF - The Official Channel', 'language': 'Hebrew', 'type': 'Israeli side'},
-    'ForumPressReleases': {'group_name': 'Until the Last Hostage - The Official Page', 'language': 'Hebrew', 'type': 'Israeli side'},
+    'idf_telegram': GroupMeta('IDF - The Official Channel', 'Hebrew', 'Israeli side'),
+    'ForumPressReleases': GroupMeta('Until the Last Hostage - The Official Page', 'Hebrew', 'Israeli side'),
 
     # Israeli commentary groups
-    'abualiexpress': {'group_name': 'Abu Ali Express', 'language': 'Hebrew', 'type': 'Israeli commentary'},
-    'arabworld301news': {'group_name': 'Arab World 301 News', 'language': 'Hebrew', 'type': 'Israeli commentary'},
-    'salehdesk1': {'group_name': 'Abu Saleh The Arab Desk', 'language': 'Hebrew', 'type': 'Israeli commentary'},
+    'abualiexpress': GroupMeta('Abu Ali Express', 'Hebrew', 'Israeli commentary'),
+    'arabworld301news': GroupMeta('Arab World 301 News', 'Hebrew', 'Israeli commentary'),
+    'salehdesk1': GroupMeta('Abu Saleh The Arab Desk', 'Hebrew', 'Israeli commentary'),
 
     # Israeli news groups
-    'yediotnews': {'group_name': 'News from the Field on Telegram', 'language': 'Hebrew', 'type': 'Israeli news'},
-    'Realtimesecurity1': {'group_name': 'Real-Time News', 'language': 'Hebrew', 'type': 'Israeli news'},
-    'New_security8200': {'group_name': 'News Channel 8200', 'language': 'Hebrew', 'type': 'Israeli news'},
+    'yediotnews': GroupMeta('News from the Field on Telegram', 'Hebrew', 'Israeli news'),
+    'Realtimesecurity1': GroupMeta('Real-Time News', 'Hebrew', 'Israeli news'),
+    'New_security8200': GroupMeta('News Channel 8200', 'Hebrew', 'Israeli news'),
 
     # The Palestinian side groups
-    'hamasps': {'group_name': 'Hamas Movement', 'language': 'Arabic', 'type': 'Palestinian side'},
-    'qassambrigades': {'group_name': 'Al-Qassam Brigades', 'language': 'Arabic', 'type': 'Palestinian side'},
+    'hamasps': GroupMeta('Hamas Movement', 'Arabic', 'Palestinian side'),
+    'qassambrigades': GroupMeta('Al-Qassam Brigades', 'Arabic', 'Palestinian side'),
 
     # Palestinian news groups
-    'gazaalannet': {'group_name': 'Gaza Now', 'language': 'Arabic', 'type': 'Palestinian news'},
-    'SerajSat': {'group_name': 'Al-Aqsa Channel', 'language': 'Arabic', 'type': 'Palestinian news'},
-    'ShehabTelegram': {'group_name': 'Shehab Agency', 'language': 'Arabic', 'type': 'Palestinian news'},
+    'gazaalannet': GroupMeta('Gaza Now', 'Arabic', 'Palestinian news'),
+    'SerajSat': GroupMeta('Al-Aqsa Channel', 'Arabic', 'Palestinian news'),
+    'ShehabTelegram': GroupMeta('Shehab Agency', 'Arabic', 'Palestinian news'),
 }
 
 
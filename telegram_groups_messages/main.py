@@ -6,6 +6,7 @@ from tqdm import tqdm
 from wakepy.modes import keep
 
 from telegram_groups_messages.consts import TELEGRAM_GROUPS_MAP
+from telegram_groups_messages.messages_database import MessageDatabase
 from telegram_groups_messages.telegram_extractor import TelegramExtractor
 
 if __name__ == "__main__":
@@ -14,18 +15,54 @@ if __name__ == "__main__":
     start_local = datetime(2023, 10, 6, 0, 0, 0, tzinfo=israel_tz)
     end_local = datetime(2025, 2, 21, 23, 59, 59, tzinfo=israel_tz)
 
-    async def extract_all_groups_messages(groups_names, start, end):
+    async def extract_all_groups_messages(groups_names, start, end, max_concurrency=4, bulk_load=None):
         """
         Extracts messages for all specified Telegram groups within a given time range.
 
+        The groups are sharded round-robin across the configured Telegram accounts, and each account extracts
+        its groups concurrently over its own shared client, with at most max_concurrency groups in flight
+        per account to stay clear of Telegram's flood-wait limits. A flood wait on one account does not
+        stall the others.
+
         Args:
             groups_names (iterable): An iterable of group names to extract messages from.
             start (datetime): The start datetime for the extraction period.
             end (datetime): The end datetime for the extraction period.
+            max_concurrency (int, optional): The maximum number of groups extracted at the same time by one account.
+                Defaults to 4.
+            bulk_load (bool, optional): Whether to drop the secondary indexes during the extraction and rebuild them
+                at the end. Defaults to doing so only for the initial load into an empty table, since an incremental
+                run inserts too few rows to pay for rebuilding the indexes of the whole table.
         """
-        extractor = TelegramExtractor(table_name='groups_messages')
-        for group in tqdm(groups_names, desc="Extracting messages from groups", unit="group", total=len(groups_names)):
-            await extractor.extract_messages(group, start, end)
+        with MessageDatabase('data/telegram_data.db') as db:
+            # The clients of all the accounts are connected once up front and closed once at the end
+            async with TelegramExtractor(table_name='groups_messages', db=db) as extractor:
+                semaphores = [asyncio.Semaphore(max_concurrency) for _ in extractor.accounts]
+
+                with tqdm(desc="Extracting messages from groups", unit="group", total=len(groups_names)) as pbar:
+
+                    async def extract_group(group, account_index):
+                        async with semaphores[account_index]:
+                            try:
+                                await extractor.extract_messages(group, start, end, account_index)
+                            finally:
+                                pbar.update(1)
+                                # Bound the WAL after every group, and refresh planner statistics every 4 groups
+                                await extractor.run_in_db_thread(db.checkpoint, pbar.n % 4 == 0)
+
+                    if bulk_load is None:
+                        bulk_load = extractor.db.is_table_empty(extractor.table)
+
+                    # Bulk load without secondary indexes, then build them once at the end
+                    if bulk_load:
+                        extractor.db.drop_indexes(extractor.table)
+                    try:
+                        await asyncio.gather(*(
+                            extract_group(group, i % len(extractor.accounts)) for i, group in enumerate(groups_names)
+                        ))
+                    finally:
+                        if bulk_load:
+                            extractor.db.rebuild_indexes(extractor.table)
 
     # Run the extraction with local start/end
     with keep.running():
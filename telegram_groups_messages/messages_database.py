@@ -1,15 +1,79 @@
 import sqlite3
 from dataclasses import dataclass
-import json
-from typing import List, Dict, Optional
+from itertools import chain, islice
+from operator import attrgetter
+from typing import Iterable, List, Dict, NamedTuple, Optional
+
+import orjson
+
+
+# Page size of newly created database files. It only takes effect on a file that has no pages yet, so it is
+# set before switching to WAL: an existing database keeps its page size (changing it would need a VACUUM
+# outside WAL mode).
+NEW_DATABASE_PAGE_SIZE = 8192
+
+# Connection-level settings applied whenever the database file is opened.
+# synchronous=NORMAL is safe under WAL: commits no longer fsync, only checkpoints do.
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=10737418240;
+    PRAGMA cache_size=-65536;
+    PRAGMA busy_timeout=30000;
+"""
+
+# Secondary indexes of a messages table (index name -> indexed columns)
+MESSAGE_INDEXES = {
+    'idx_messages_local_date': 'local_date',
+    # Covers per-group time-range queries over views/forward_count without touching the table itself
+    'idx_messages_group_date': 'group_name, local_date, views, forward_count',
+}
+
+
+def _configure_connection(conn: sqlite3.Connection):
+    """
+    Applies CONNECTION_PRAGMAS to a connection, setting NEW_DATABASE_PAGE_SIZE first if the database file is new.
+    """
+    if conn.execute("PRAGMA page_count").fetchone()[0] == 0:
+        conn.execute(f"PRAGMA page_size={NEW_DATABASE_PAGE_SIZE}")
+    conn.executescript(CONNECTION_PRAGMAS)
+
+
+def _to_json(value) -> Optional[str]:
+    """
+    Serializes a dict/list column as compact JSON (no whitespace, non-ASCII kept as-is) using orjson.
+    The UTF-8 bytes are decoded so the value keeps TEXT affinity; empty or missing values are stored as NULL.
+    """
+    return orjson.dumps(value).decode() if value else None
+
+
+# MessageData fields in INSERT column order: the plain values first, then the dict/list values stored as JSON.
+# Both groups are read with a C-implemented attrgetter instead of per-field attribute access in Python.
+PLAIN_COLUMNS = (
+    'group_name', 'message_id', 'utc_date', 'local_date', 'text', 'sender_id', 'reply_to_msg_id',
+    'forward_count', 'media_type', 'views', 'hour', 'day_of_week', 'month', 'week_of_year', 'word_count', 'emoji_count',
+)
+JSON_COLUMNS = ('media_attributes', 'forwarded_from', 'entities', 'reactions')
+INSERT_COLUMNS = PLAIN_COLUMNS + JSON_COLUMNS
+_get_plain_values = attrgetter(*PLAIN_COLUMNS)
+_get_json_values = attrgetter(*JSON_COLUMNS)
+
+
+def _pack_message(m: "MessageData") -> tuple:
+    """
+    Converts a MessageData object into the tuple of values bound to one row of the INSERT statement.
+    """
+    return _get_plain_values(m) + tuple(map(_to_json, _get_json_values(m)))
 
 
 ######################################################################################################
 
-@dataclass
+@dataclass(slots=True)
 class MessageData:
     """
     A data class to represent a Telegram message.
+    Instances use __slots__ instead of a per-instance __dict__, since many of them are created during an extraction.
 
     Attributes:
         group_name (Optional[str]): Name of the Telegram group/channel from which the message was extracted.
@@ -22,7 +86,7 @@ class MessageData:
         forwarded_from (Optional[Dict]): Detailed info about original sender/channel if the message is forwarded.
         forward_count (Optional[int]): How many times this message has been forwarded (if available).
         media_type (Optional[str]): Type of media attached (e.g., "document", "photo", "poll", "webpage").
-        media_attributes (Dict): Structured metadata about the attached media (IDs, sizes, filenames, etc.).
+        media_attributes (Optional[Dict]): Structured metadata about the attached media (IDs, sizes, filenames, etc.).
         entities (Optional[List[Dict]]): A list of message entities (e.g., URLs, mentions) with offsets and lengths.
         views (Optional[int]): Number of views the message has received (channels only).
         reactions (Optional[List[Dict]]): A list of reaction objects (emoji + count).
@@ -32,6 +96,8 @@ class MessageData:
         week_of_year (int): Local week number of the year (0-53).
         word_count (int): Number of words in the message text.
         emoji_count (int): Number of emojis in the message text.
+
+    The dict/list fields are stored as JSON text, and empty ones as NULL.
     """
     group_name: str
     message_id: int
@@ -62,6 +128,18 @@ class MessageData:
     emoji_count: Optional[int]
 
 
+class SyncState(NamedTuple):
+    """
+    The update state of a Telegram channel after its last extraction, from which the next extraction
+    can fetch only the newer messages (via GetChannelDifferenceRequest) instead of paging the history again.
+    """
+    group_name: str
+    channel_id: int
+    pts: int
+    last_date: str  # ISO-formatted UTC datetime up to which the channel is fully extracted
+    last_msg_id: int
+
+
 ######################################################################################################
 
 class MessageDatabase:
@@ -72,8 +150,18 @@ class MessageDatabase:
         Args:
             db_name (str): The name of the SQLite database file.
         """
-        self.conn = sqlite3.connect(db_name)
+        # isolation_level=None disables the implicit per-statement transactions of the sqlite3 module,
+        # so bulk writes can be grouped into a single explicit BEGIN/COMMIT.
+        # check_same_thread=False lets the connection be handed to a dedicated writer thread; callers
+        # must still use it from one thread at a time.
+        self.conn = sqlite3.connect(db_name, isolation_level=None, check_same_thread=False)
+        _configure_connection(self.conn)
         self.cur = self.conn.cursor()
+        # Multi-row INSERT statements, keyed by (table_name, number of rows)
+        self._insert_sql_cache = {}
+        # Rows per INSERT allowed by the bound-parameter limit of the linked SQLite library
+        # (999 before SQLite 3.32, 32766 since, and often raised further by distributions)
+        self._max_rows_per_statement = self.conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) // len(INSERT_COLUMNS)
         # self.create_table()
 
     def create_table(self, table_name):
@@ -84,6 +172,8 @@ class MessageDatabase:
             table_name (str): The name of the table to create.
 
         The primary key is a composite key consisting of group_name and message_id.
+        The table is created WITHOUT ROWID, so rows are stored directly in the primary-key B-tree
+        instead of in a rowid table plus a separate unique index on the key.
         """
 
         # Create a new table if it doesn't exist
@@ -120,82 +210,192 @@ class MessageDatabase:
                 emoji_count INTEGER,
 
                 PRIMARY KEY (group_name, message_id)
-            )
+            ) WITHOUT ROWID
         """)
         self.conn.commit()
 
-        self.cur.execute(f"CREATE INDEX IF NOT EXISTS idx_messages_local_date ON {table_name} (local_date)")
+        for index_name, columns in MESSAGE_INDEXES.items():
+            self.cur.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})")
         self.conn.commit()
 
-    def insert_messages(self, messages: List[MessageData], batch_size: int = 1000, table_name: str = "messages"):
+    def close(self):
         """
-        Inserts a list of messages into the specified SQLite table in batches.
+        Runs PRAGMA optimize (refreshing stale planner statistics) and closes the cursor and the database connection.
+
+        The connection is meant to live as long as the process that writes through it,
+        so this should only be called once all inserts are done.
+        """
+        self.cur.execute("PRAGMA optimize")
+        self.cur.close()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def checkpoint(self, optimize: bool = False):
+        """
+        Checkpoints the WAL into the database file and truncates it, so the WAL does not keep growing
+        during a long extraction run.
 
         Args:
-            messages (List[MessageData]): A list of MessageData objects to insert into the database.
-            batch_size (int, optional): The number of messages to insert in each batch. Defaults to 1000.
+            optimize (bool, optional): Whether to also run PRAGMA optimize to refresh planner statistics. Defaults to False.
+        """
+        # A checkpoint cannot run while this connection holds an open write transaction
+        self.commit()
+        self.cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if optimize:
+            self.cur.execute("PRAGMA optimize")
+
+    def begin_transaction(self):
+        """
+        Starts an explicit transaction, unless one is already open on the connection.
+
+        Calls to insert_messages made while it is open join it, so they are committed (and synced)
+        together by commit() instead of one by one.
+        """
+        if not self.conn.in_transaction:
+            self.cur.execute("BEGIN")
+
+    def commit(self):
+        """
+        Commits the open transaction, if any.
+        """
+        if self.conn.in_transaction:
+            self.cur.execute("COMMIT")
+
+    def rollback(self):
+        """
+        Rolls back the open transaction, if any.
+        """
+        if self.conn.in_transaction:
+            self.cur.execute("ROLLBACK")
+
+    def drop_indexes(self, table_name: str):
+        """
+        Drops the secondary indexes of a messages table before a bulk load,
+        so inserts do not have to update the index B-trees row by row.
+
+        Args:
+            table_name (str): The name of the table whose indexes should be dropped.
+        """
+        for index_name in MESSAGE_INDEXES:
+            self.cur.execute(f"DROP INDEX IF EXISTS {index_name}")
+        print(f"Dropped the indexes of table '{table_name}' for bulk loading.")
+
+    def rebuild_indexes(self, table_name: str):
+        """
+        Recreates the secondary indexes of a messages table after a bulk load (one sorted pass per index)
+        and refreshes the query planner statistics.
+
+        Args:
+            table_name (str): The name of the table whose indexes should be rebuilt.
+        """
+        for index_name, columns in MESSAGE_INDEXES.items():
+            self.cur.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} ({columns})")
+        self.cur.execute(f"ANALYZE {table_name}")
+        print(f"Rebuilt the indexes of table '{table_name}'.")
+
+    def is_table_empty(self, table_name: str) -> bool:
+        """
+        Checks whether a table has no rows yet, e.g. to tell an initial load from an incremental one.
+
+        Args:
+            table_name (str): The name of the table to check.
+
+        Returns:
+            bool: True if the table is empty.
+        """
+        self.cur.execute(f"SELECT 1 FROM {table_name} LIMIT 1")
+        return self.cur.fetchone() is None
+
+    def insert_messages(self, messages: Iterable[MessageData], batch_size: int = 5000, table_name: str = "messages") -> int:
+        """
+        Inserts messages into the specified SQLite table in batches.
+
+        The messages are consumed lazily, one batch at a time, so a generator keeps memory bounded
+        by the batch size regardless of the total number of messages.
+
+        Args:
+            messages (Iterable[MessageData]): The MessageData objects to insert into the database.
+            batch_size (int, optional): The number of messages to insert in each batch. Defaults to 5000.
             table_name (str, optional): The name of the table to insert the messages into. Defaults to "messages".
+
+        Returns:
+            int: The number of inserted messages.
         """
-        for i in range(0, len(messages), batch_size):
-            batch = messages[i:i + batch_size]
-            self.cur.executemany(
-                f"""INSERT INTO {table_name} (
-                    group_name,
-                    message_id,
-                    utc_date,
-                    local_date,
-                    text,
-                    sender_id,
-                    reply_to_msg_id,
-                    forward_count,
-                    media_type,
-                    media_attributes,
-                    forwarded_from,
-                    entities,
-                    views,
-                    reactions,
-                    hour,
-                    day_of_week,
-                    month,
-                    week_of_year,
-                    word_count,
-                    emoji_count
-                ) VALUES (
-                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-                )""",
-                [
-                    (
-                        m.group_name,
-                        m.message_id,
-
-                        m.utc_date,
-                        m.local_date,
-
-                        m.text,
-                        m.sender_id,
-                        m.reply_to_msg_id,
-
-                        m.forward_count,
-                        m.media_type,
-                        json.dumps(m.media_attributes) if m.media_attributes else None,
-
-                        json.dumps(m.forwarded_from) if m.forwarded_from else None,
-                        json.dumps(m.entities) if m.entities else None,
-
-                        m.views,
-                        json.dumps(m.reactions) if m.reactions else None,
-
-                        m.hour,
-                        m.day_of_week,
-                        m.month,
-                        m.week_of_year,
-                        m.word_count,
-                        m.emoji_count
-                    )
-                    for m in batch
-                ]
-            )
-            self.conn.commit()
+        # Each statement inserts many rows at once (INSERT ... VALUES (...), (...), ...),
+        # bounded by SQLite's limit on the number of bound parameters.
+        rows_per_statement = min(batch_size, self._max_rows_per_statement)
+
+        # Looked up once per call. A trailing, shorter batch (e.g. every page of the extractor, which is far below
+        # the batch size) is inserted row by row with executemany, which prepares the single-row statement once
+        # and binds the rows in C, instead of building and preparing a statement for every distinct batch length.
+        full_batch_sql = self._get_insert_sql(table_name, rows_per_statement)
+        single_row_sql = self._get_insert_sql(table_name, 1)
+
+        messages = iter(messages)
+        inserted = 0
+
+        # Joins the caller's transaction if one is open (see begin_transaction);
+        # otherwise the whole call is one transaction, so its batches are committed (and synced) together
+        owns_transaction = not self.conn.in_transaction
+        if owns_transaction:
+            self.cur.execute("BEGIN")
+        try:
+            while batch := list(islice(messages, rows_per_statement)):
+                if len(batch) == rows_per_statement:
+                    self.cur.execute(full_batch_sql, list(chain.from_iterable(map(_pack_message, batch))))
+                else:
+                    self.cur.executemany(single_row_sql, map(_pack_message, batch))
+                inserted += len(batch)
+        except Exception:
+            if owns_transaction:
+                self.rollback()
+            raise
+        if owns_transaction:
+            self.commit()
+        return inserted
+
+    def _get_insert_sql(self, table_name: str, n_rows: int) -> str:
+        """
+        Returns a cached INSERT statement that inserts n_rows messages with a single multi-row VALUES clause.
+
+        Full-size batches all share one statement string, so SQLite can reuse the prepared statement;
+        the final, shorter batch of a call uses the single-row statement.
+
+        Args:
+            table_name (str): The name of the table to insert the messages into.
+            n_rows (int): The number of rows in the VALUES clause.
+
+        Returns:
+            str: The parameterized INSERT statement.
+        """
+        key = (table_name, n_rows)
+        sql = self._insert_sql_cache.get(key)
+        if sql is None:
+            sql = self._insert_sql_cache[key] = self._build_insert_sql(table_name, n_rows)
+        return sql
+
+    @staticmethod
+    def _build_insert_sql(table_name: str, n_rows: int) -> str:
+        """
+        Builds an INSERT statement over INSERT_COLUMNS with n_rows rows of placeholders.
+
+        Args:
+            table_name (str): The name of the table to insert the messages into.
+            n_rows (int): The number of rows in the VALUES clause.
+
+        Returns:
+            str: The parameterized INSERT statement.
+        """
+        row_placeholders = "(" + ", ".join(["?"] * len(INSERT_COLUMNS)) + ")"
+        return (
+            f"INSERT INTO {table_name} ({', '.join(INSERT_COLUMNS)}) VALUES "
+            + ", ".join([row_placeholders] * n_rows)
+        )
 
     def add_column_if_not_exists(self, table_name: str, column_name: str, column_definition: str):
         """
@@ -206,10 +406,11 @@ class MessageDatabase:
             column_name (str): The name of the column to add.
             column_definition (str): The column type and any constraints (e.g., 'TEXT', 'INTEGER', etc.).
         """
-        self.cur.execute(f"PRAGMA table_info({table_name})")
-        columns = [row[1] for row in self.cur.fetchall()]  # row[1] contains the column name.
+        # Let SQLite answer the lookup instead of fetching the whole column list
+        self.cur.execute("SELECT 1 FROM pragma_table_info(?) WHERE name = ? LIMIT 1", (table_name, column_name))
+        column_exists = self.cur.fetchone() is not None
 
-        if column_name not in columns:
+        if not column_exists:
             alter_query = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_definition}"
             self.cur.execute(alter_query)
             self.conn.commit()
@@ -231,6 +432,51 @@ class MessageDatabase:
         self.conn.commit()
         print(f"Index '{index_name}' created on column '{column_name}' of table '{table_name}'.")
 
+    def create_sync_state_table(self):
+        """
+        Creates the sync_state table, holding one SyncState per extracted group, if it doesn't exist already.
+        """
+        self.cur.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                group_name TEXT PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                pts INTEGER NOT NULL,
+                last_date TEXT NOT NULL,
+                last_msg_id INTEGER NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get_sync_state(self, group_name: str) -> Optional[SyncState]:
+        """
+        Retrieves the saved sync state of a group.
+
+        Args:
+            group_name (str): The name of the Telegram group.
+
+        Returns:
+            Optional[SyncState]: The saved state, or None if the group was never fully synced.
+        """
+        self.cur.execute(
+            "SELECT group_name, channel_id, pts, last_date, last_msg_id FROM sync_state WHERE group_name = ?",
+            (group_name,)
+        )
+        row = self.cur.fetchone()
+        return SyncState(*row) if row is not None else None
+
+    def save_sync_state(self, state: SyncState):
+        """
+        Saves the sync state of a group, replacing the previous one. Joins the open transaction, if any,
+        so the state is committed together with the messages it covers.
+
+        Args:
+            state (SyncState): The state to save.
+        """
+        self.cur.execute(
+            "INSERT OR REPLACE INTO sync_state (group_name, channel_id, pts, last_date, last_msg_id) VALUES (?, ?, ?, ?, ?)",
+            state
+        )
+
     # def create_new_table(self, new_table_name: str):
     #     """
     #     Create a new table with the specified name.
@@ -271,20 +517,39 @@ class MessageDatabase:
 ######################################################################################################
 
 
-def migrate_old_messages_to_new_pk(db_path: str):
+def migrate_old_messages_to_new_pk(db_path: str, chunk_size: int = 50000):
     """
     Migrates old messages to a new table with a composite primary key.
 
+    The rows are copied in rowid chunks of chunk_size, each in its own transaction, which keeps the
+    page cache bounded. For speed, the copy runs without a journal or fsyncs, so a crash, power loss or
+    error in the middle of a chunk can leave the database file corrupt: back up the file before migrating.
+    The copy uses INSERT OR IGNORE, so a migration that stopped with the file intact (e.g. between chunks)
+    can be re-run and continues where it stopped.
+
     Args:
         db_path (str): The path to the SQLite database file.
+        chunk_size (int, optional): The number of old rows copied per transaction. Defaults to 50000.
     """
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    _configure_connection(conn)
+    # The migration can be re-run, so durability is traded for speed until it is done: no fsyncs,
+    # a large page cache and an exclusive lock held for the whole run
+    conn.executescript(
+        "PRAGMA foreign_keys=OFF; PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; "
+        "PRAGMA temp_store=MEMORY; PRAGMA cache_size=-524288; PRAGMA locking_mode=EXCLUSIVE;"
+    )
     cur = conn.cursor()
 
+    # Steps 1-2 run in a single transaction, so a failure leaves the original table untouched
+    cur.execute("BEGIN")
+
     # 1) Rename the existing table
     #    (Assumes an old table named 'messages' with PK on 'message_id')
-    cur.execute("ALTER TABLE messages RENAME TO old_messages;")
-    conn.commit()
+    #    If old_messages already exists, a previous run was interrupted during the copy.
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'old_messages'")
+    if cur.fetchone() is None:
+        cur.execute("ALTER TABLE messages RENAME TO old_messages;")
 
     # 2) Create the new table with the new primary key definition
     cur.execute("""
@@ -306,21 +571,31 @@ def migrate_old_messages_to_new_pk(db_path: str):
             word_count INTEGER,
             emoji_count INTEGER,
             PRIMARY KEY (group_name, message_id)
-        )
+        ) WITHOUT ROWID
     """)
-    conn.commit()
+    cur.execute("COMMIT")
+
+    # The schema change above still had a rollback journal; the bulk copy below runs without one for speed
+    # (the original file should be backed up, see the docstring)
+    cur.execute("PRAGMA journal_mode=OFF")
 
-    # 3) Copy data from the old table to the new one.
+    # 3) Copy data from the old table to the new one, one rowid range per transaction.
     #    If the old table did not contain a group_name or had NULL, you might need to handle that.
     #    Example below uses COALESCE to map NULL group_name to '' (empty string).
     #
-    #    Also, if your old data can have collisions on (group_name, message_id), use 'INSERT OR IGNORE'
-    #    or 'INSERT OR REPLACE' to handle duplicates gracefully.
+    #    'INSERT OR IGNORE' skips collisions on (group_name, message_id), including rows already
+    #    copied by an interrupted run.
     #
     #    The SELECT must list columns in the same order as the INSERT.
     #
-    cur.execute("""
-        INSERT INTO messages (
+    #    The old rowid is the old message_id, so the chunks already advance in message_id order;
+    #    sorting each chunk by the new key makes the primary-key B-tree grow by appends instead of
+    #    random page writes.
+    #
+    cur.execute("SELECT MIN(rowid), MAX(rowid) FROM old_messages")
+    min_rowid, max_rowid = cur.fetchone()
+    copy_sql = """
+        INSERT OR IGNORE INTO messages (
             group_name,
             message_id,
             date,
@@ -356,16 +631,28 @@ def migrate_old_messages_to_new_pk(db_path: str):
             word_count,
             emoji_count
         FROM old_messages
-    """)
-    conn.commit()
+        WHERE rowid BETWEEN ? AND ?
+        ORDER BY group_name, message_id
+    """
+    if min_rowid is not None:
+        for chunk_start in range(min_rowid, max_rowid + 1, chunk_size):
+            cur.execute("BEGIN")
+            cur.execute(copy_sql, (chunk_start, chunk_start + chunk_size - 1))
+            cur.execute("COMMIT")
+
+    # Back to the regular durable settings before anything else is changed: once old_messages is dropped,
+    # the new table is the only copy of the data, so the rest of the migration must be journaled
+    conn.executescript("PRAGMA locking_mode=NORMAL; PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
 
     # 4) Drop the old table now that the data is migrated
     cur.execute("DROP TABLE old_messages;")
-    conn.commit()
 
     # 5) Optionally create any additional indexes
     cur.execute("CREATE INDEX IF NOT EXISTS idx_messages_date ON messages (date)")
-    conn.commit()
+
+    # 6) Reclaim the pages freed by dropping old_messages, and refresh the planner statistics for the new table
+    cur.execute("VACUUM")
+    cur.execute("ANALYZE messages")
 
     cur.close()
     conn.close()
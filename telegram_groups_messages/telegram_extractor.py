@@ -1,12 +1,16 @@
 import pytz
 from telethon import TelegramClient
 from telethon.tl.functions.messages import GetHistoryRequest
+from telethon.tl.functions.channels import GetFullChannelRequest
+from telethon.tl.functions.updates import GetChannelDifferenceRequest
 from telethon.errors import FloodWaitError
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import os
-from typing import List, Any
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
 from telethon.tl.types import (
     MessageMediaDocument,
@@ -14,63 +18,519 @@ from telethon.tl.types import (
     MessageMediaPoll,
     MessageMediaWebPage,
     DocumentAttributeFilename,
-    ReactionEmoji
+    ReactionEmoji,
+    Channel,
+    ChannelMessagesFilterEmpty,
+    MessageEmpty
 )
-import emoji
+from telethon.tl.types.updates import ChannelDifferenceEmpty, ChannelDifferenceTooLong
+import regex
 
-from telegram_groups_messages.messages_database import MessageData, MessageDatabase
+from telegram_groups_messages.messages_database import MessageData, MessageDatabase, SyncState
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Resolved once: pytz.timezone() is a relatively expensive lookup to repeat for every message
+_LOCAL_TZ = pytz.timezone("Asia/Jerusalem")
+_UTC = pytz.utc
+
+# One emoji per match, counted like emoji.emoji_list(): flags, keycaps, and pictographs with their
+# variation selector, skin tone, tag and ZWJ-joined parts (e.g. family emojis) each count once.
+# The third-party regex module is used for its Unicode property support.
+_EMOJI_RE = regex.compile(
+    r'[\U0001F1E6-\U0001F1FF]{2}'
+    r'|[#*0-9]\uFE0F?\u20E3'
+    r'|\p{Extended_Pictographic}[\uFE0F\U0001F3FB-\U0001F3FF]?[\U000E0020-\U000E007F]*'
+    r'(?:\u200D\p{Extended_Pictographic}[\uFE0F\U0001F3FB-\U0001F3FF]?)*'
+)
+
+
+def _format_datetime(d: datetime) -> str:
+    """
+    Formats an aware datetime like d.strftime("%Y-%m-%d %H:%M:%S%z"), using the (C-level) isoformat
+    instead of strftime.
+
+    Args:
+        d (datetime): The timezone-aware datetime to format.
+
+    Returns:
+        str: The formatted datetime, e.g. "2025-03-31 13:45:00+0300".
+    """
+    iso = d.isoformat(' ', 'seconds')  # e.g. "2025-03-31 13:45:00+03:00"
+    return iso[:19] + iso[19:].replace(':', '')
+
+
+def _week_of_year(d: datetime) -> int:
+    """
+    Computes the week number of the year like int(d.strftime("%U")): weeks start on Sunday,
+    and the days before the first Sunday of the year are in week 0.
+
+    Args:
+        d (datetime): The datetime whose week number to compute.
+
+    Returns:
+        int: The week number of the year (0-53).
+    """
+    day_of_year = d.toordinal() - date(d.year, 1, 1).toordinal()
+    days_since_sunday = (d.weekday() + 1) % 7
+    return (day_of_year + 7 - days_since_sunday) // 7
+
+
+class TelegramAccount(NamedTuple):
+    """
+    The credentials and the session file of one Telegram account used for the extraction.
+    """
+    api_id: int
+    api_hash: str
+    phone: str
+    two_fa: str
+    session_name: str
+
+
+def load_accounts(session_name: str = 'war_analysis_session') -> List[TelegramAccount]:
+    """
+    Loads the Telegram accounts from the environment variables.
+
+    The first account is read from API_ID, API_HASH, PHONE_NUMBER and PASSWORD_2FA and uses the session
+    session_name. Any additional accounts are read from the same variables suffixed with _2, _3, ...
+    (e.g. API_ID_2) and use sessions suffixed the same way, since each account needs its own session file.
+
+    Args:
+        session_name (str, optional): The session name of the first account. Defaults to 'war_analysis_session'.
+
+    Returns:
+        List[TelegramAccount]: The configured accounts, in order.
+    """
+    accounts = [TelegramAccount(
+        int(os.getenv('API_ID')), os.getenv('API_HASH'), os.getenv('PHONE_NUMBER'), os.getenv('PASSWORD_2FA'),
+        session_name
+    )]
+    while os.getenv(f'API_ID_{len(accounts) + 1}'):
+        suffix = f'_{len(accounts) + 1}'
+        accounts.append(TelegramAccount(
+            int(os.getenv(f'API_ID{suffix}')), os.getenv(f'API_HASH{suffix}'), os.getenv(f'PHONE_NUMBER{suffix}'),
+            os.getenv(f'PASSWORD_2FA{suffix}'), f'{session_name}{suffix}'
+        ))
+    return accounts
+
+
+def _process_document(message) -> Optional[Tuple[str, dict]]:
+    """
+    Extracts the media attributes of a document message.
+
+    Args:
+        message: The Telegram message object, whose media is a MessageMediaDocument.
+
+    Returns:
+        Optional[Tuple[str, dict]]: The media type ('document') and its attributes, or None if the message
+            has no document.
+    """
+    if not message.document:
+        return None
+
+    # Extract common fields
+    media_attributes = {
+        "document_id": message.document.id,
+        "mime_type": message.document.mime_type,
+        "size": message.document.size,
+    }
+
+    # Attempt to find a filename attribute (if any)
+    filename_attr = next(
+        (
+            attr
+            for attr in message.document.attributes
+            if isinstance(attr, DocumentAttributeFilename)
+        ),
+        None
+    )
+    if filename_attr:
+        media_attributes["filename"] = filename_attr.file_name
+
+    return "document", media_attributes
+
+
+def _process_photo(message) -> Optional[Tuple[str, dict]]:
+    """
+    Extracts the media attributes of a photo message.
+
+    Args:
+        message: The Telegram message object, whose media is a MessageMediaPhoto.
+
+    Returns:
+        Optional[Tuple[str, dict]]: The media type ('photo') and its attributes, or None if the message has no photo.
+    """
+    if not message.photo:
+        return None
+
+    # Photo objects carry their dimensions per size, not on the photo itself, so w/h are looked up defensively
+    return "photo", {
+        "photo_id": message.photo.id,
+        "width": getattr(message.photo, "w", None),
+        "height": getattr(message.photo, "h", None),
+    }
+
+
+def _process_poll(message) -> Optional[Tuple[str, dict]]:
+    """
+    Extracts the media attributes of a poll message.
+
+    Args:
+        message: The Telegram message object, whose media is a MessageMediaPoll.
+
+    Returns:
+        Optional[Tuple[str, dict]]: The media type ('poll') and its attributes, or None if the media has no poll.
+    """
+    poll_obj = message.media.poll
+    if not poll_obj:
+        return None
+
+    # poll_obj.question might be TextWithEntities or a regular string.
+    question_text = poll_obj.question
+    if hasattr(question_text, "text"):
+        # If it's TextWithEntities, grab just the text
+        question_text = question_text.text
+
+    # Each answer might also contain a text field that’s non-serializable.
+    answers_list = []
+    for answer in poll_obj.answers:
+        ans_text = answer.text
+        if hasattr(ans_text, "text"):
+            ans_text = ans_text.text
+
+        answers_list.append({
+            "text": ans_text,
+            "option": answer.option.hex()  # raw bytes -> hex
+        })
+
+    return "poll", {
+        "question": question_text,
+        "multiple_choice": poll_obj.multiple_choice,
+        "quiz": poll_obj.quiz,
+        "answers": answers_list,
+    }
+
+
+def _process_webpage(message) -> Optional[Tuple[str, dict]]:
+    """
+    Extracts the media attributes of a web page preview message.
+
+    Args:
+        message: The Telegram message object, whose media is a MessageMediaWebPage.
+
+    Returns:
+        Optional[Tuple[str, dict]]: The media type ('webpage') and its attributes, or None if the media has no web page.
+    """
+    web_page = message.media.webpage
+    if not web_page:
+        return None
+
+    # If the webpage is actually WebPageEmpty or another minimal type, skip the rest
+    if type(web_page).__name__ == "WebPageEmpty":
+        # Possibly store minimal or fallback data
+        return "webpage", {"raw_object": str(web_page)}
+
+    # Otherwise, proceed (this implies we have a "real" WebPage, or a WebPagePending that lacks most fields)
+    media_attributes = {
+        "url": getattr(web_page, "url", None),
+        "site_name": getattr(web_page, "site_name", None),
+        "title": getattr(web_page, "title", None),
+        "description": getattr(web_page, "description", None),
+        "author": getattr(web_page, "author", None),
+        "embed_url": getattr(web_page, "embed_url", None),
+        "embed_type": getattr(web_page, "embed_type", None),
+    }
+
+    # If the webpage includes a photo, document, etc., check for existence
+    if getattr(web_page, "photo", None):
+        media_attributes["photo_id"] = web_page.photo.id
+    if getattr(web_page, "document", None):
+        media_attributes["document_id"] = web_page.document.id
+
+    return "webpage", media_attributes
+
+
+# Media class -> handler extracting (media_type, media_attributes), dispatched on the exact type of message.media
+_MEDIA_HANDLERS = {
+    MessageMediaDocument: _process_document,
+    MessageMediaPhoto: _process_photo,
+    MessageMediaPoll: _process_poll,
+    MessageMediaWebPage: _process_webpage,
+}
+
+
+def _process_message(message, group_name) -> MessageData:
+    """
+    Processes a Telegram message and converts it into a MessageData object, including:
+      - Local timezone handling (Asia/Jerusalem)
+      - Extended forward info (channel ID, post author, date, etc.)
+      - Detailed media type/attributes (document, photo, poll, webpage, fallback)
+      - Emoji count using a precompiled emoji regex
+      - Basic metrics (word count, day_of_week, etc.)
+
+    Args:
+        message: The Telegram message object (from Telethon).
+        group_name (str): The name of the Telegram group/channel.
+
+    Returns:
+        MessageData: An object containing the processed message data.
+    """
+
+    # ----------------------------------------------------------------------------
+    # 1) Timezone Handling
+    # ----------------------------------------------------------------------------
+    # Telethon messages are often UTC or naive, so ensure we treat them as UTC:
+    utc_date = message.date.replace(tzinfo=timezone.utc)
+    # Convert to local time (Asia/Jerusalem), directly from the naive UTC wall time:
+    local_date = _LOCAL_TZ.fromutc(utc_date.replace(tzinfo=None))
+
+    # ----------------------------------------------------------------------------
+    # 2) Extended Forward Info
+    # ----------------------------------------------------------------------------
+    forward_info = None
+    if message.fwd_from:
+        forward_info = {
+            "forwarded_from_id": str(message.fwd_from.from_id) if message.fwd_from.from_id else None,
+            # channel_id only exists on forward headers of older API layers
+            "forwarded_channel_id": getattr(message.fwd_from, "channel_id", None),
+            "forwarded_channel_post": message.fwd_from.channel_post,
+            "forwarded_post_author": message.fwd_from.post_author,
+            "forwarded_date": (
+                message.fwd_from.date.isoformat(' ', 'seconds')[:19]
+                if message.fwd_from.date else None
+            ),
+        }
+
+    # also capture the "forwards" count:
+    forward_count = message.forwards
+
+    # ----------------------------------------------------------------------------
+    # 3) Media Handling
+    # ----------------------------------------------------------------------------
+    media_type, media_attributes = _process_message_with_media_types(message)
+
+    # ----------------------------------------------------------------------------
+    # 4) Reactions (if present)
+    # ----------------------------------------------------------------------------
+    reactions = None
+    if message.reactions:
+        reactions = []
+        for r in message.reactions.results:
+            if isinstance(r.reaction, ReactionEmoji):
+                reactions.append({
+                    "emoji": r.reaction.emoticon,
+                    "count": r.count
+                })
+            else:
+                # Fallback for custom or unknown reaction type
+                reactions.append({
+                    "emoji": str(r.reaction),
+                    "count": r.count
+                })
+
+    # ----------------------------------------------------------------------------
+    # 5) Construct and Return the MessageData object
+    # ----------------------------------------------------------------------------
+
+    # Word count and emoji count:
+    text_content = message.message or ""
+
+    return MessageData(
+        group_name=group_name,
+        message_id=message.id,
+
+        # Local time with DST included:
+        utc_date=_format_datetime(utc_date),  # e.g. "2025-03-31 10:45:00+0000"
+        local_date=_format_datetime(local_date),  # e.g. "2025-03-31 13:45:00+0300"
+
+        text=text_content,
+        sender_id=message.sender_id,
+        reply_to_msg_id=message.reply_to_msg_id,
+
+        # Extended forward data:
+        forwarded_from=forward_info,
+        forward_count=forward_count,
+
+        # Media details:
+        media_type=media_type,
+        media_attributes=media_attributes,
+
+        # Entities (Telethon entity types are their classes, e.g. MessageEntityUrl):
+        entities=[
+            {"type": type(e).__name__, "offset": e.offset, "length": e.length}
+            for e in message.entities
+        ] if message.entities else None,
+
+        # Views and reactions:
+        views=message.views,
+        reactions=reactions,
+
+        # Time-based fields (local):
+        hour=local_date.hour,
+        day_of_week=local_date.weekday(),
+        month=local_date.month,
+        week_of_year=_week_of_year(local_date),
+
+        # Basic text metrics:
+        word_count=len(text_content.split()) if text_content else 0,
+        emoji_count=len(_EMOJI_RE.findall(text_content)) if text_content else 0
+    )
+
+
+def _process_message_with_media_types(message):
+    """
+    Processes a Telegram message to handle several media types: Document, Photo, Poll, and WebPage.
+
+    Args:
+        message: The Telegram message object to process.
+
+    Returns:
+        tuple: A tuple containing:
+            - media_type (str or None): The type of media (e.g., 'document', 'photo', 'poll', 'webpage') or None if no media.
+            - media_attributes (dict): A dictionary of media attributes specific to the media type.
+    """
+
+    media_type = None
+    media_attributes = {}
+
+    if not message.media:
+        return media_type, media_attributes
+
+    # Identify media type
+    handler = _MEDIA_HANDLERS.get(type(message.media))
+    processed = handler(message) if handler is not None else None
+    if processed is None:
+        # Fallback case: unknown or unhandled media type
+        media_type = type(message.media).__name__
+        media_attributes["raw_object"] = str(message.media)
+        return media_type, media_attributes
+
+    return processed
+
+
+class RateLimiter:
+    """
+    An asyncio token bucket limiting the requests of one Telegram account.
+
+    Requests run back to back while the account is under max_rate, instead of sleeping a fixed delay
+    after every request. After a FloodWait, pause() makes every request of the account wait it out together.
+
+    Attributes:
+        max_rate (float): The sustained number of requests allowed per second.
+        burst (float): The number of requests that may run back to back after an idle period.
+    """
+    def __init__(self, max_rate: float, burst: float = 1):
+        """
+        Initializes the RateLimiter with a full bucket.
+
+        Args:
+            max_rate (float): The sustained number of requests allowed per second.
+            burst (float, optional): The number of requests that may run back to back after an idle period. Defaults to 1.
+        """
+        self.max_rate = max_rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        # Waiting requests are served in arrival order
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Waits until a request may be sent, and takes a token for it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.max_rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.max_rate)
+
+    def pause(self, seconds: float):
+        """
+        Blocks all requests for the given number of seconds, after which the bucket refills from empty.
+
+        Args:
+            seconds (float): The number of seconds to block the requests for.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+        self._updated = self._paused_until
+
 
 class TelegramExtractor:
     """
     A class to extract messages from a Telegram group and store them in a SQLite database.
 
     Attributes:
-        api_id (str): The API ID for the Telegram client.
-        api_hash (str): The API hash for the Telegram client.
-        phone (str): The phone number associated with the Telegram account.
-        two_fa (str): The two-factor authentication password for the Telegram account.
-        session_name (str): The session name for the Telegram client.
+        accounts (List[TelegramAccount]): The Telegram accounts to extract with, one client each.
         batch_size (int): The number of messages to fetch in each batch.
-        rate_limit_delay (float): The delay in seconds to wait between requests to avoid rate limiting.
+        max_requests_per_second (float): The maximum sustained rate of history requests per account.
+        commit_every (int): The number of inserted batches after which the open transaction is committed.
         db (MessageDatabase): The database object to store messages.
         table (str): The name of the table to store messages in.
     """
-    def __init__(self, table_name: str, session_name: str = 'war_analysis_session'):
+    def __init__(self, table_name: str, session_name: str = 'war_analysis_session', db: Optional[MessageDatabase] = None,
+                 accounts: Optional[List[TelegramAccount]] = None):
         """
         Initializes the TelegramExtractor with the specified table name and session name.
 
         Args:
             table_name (str): The name of the table to store messages in.
-            session_name (str, optional): The session name for the Telegram client. Defaults to 'war_analysis_session'.
+            session_name (str, optional): The session name of the first account loaded from the environment.
+                Defaults to 'war_analysis_session'.
+            db (Optional[MessageDatabase], optional): An open database to share; the connection (and its cached
+                INSERT statements) is kept for the extractor's lifetime. Defaults to a new connection to
+                'data/telegram_data.db'.
+            accounts (Optional[List[TelegramAccount]], optional): The Telegram accounts to extract with.
+                Defaults to the accounts configured in the environment (see load_accounts).
         """
         # Load environment variables
-        self.api_id = int(os.getenv('API_ID'))
-        self.api_hash = os.getenv('API_HASH')
-        self.phone = os.getenv('PHONE_NUMBER')  # Add phone
-        self.two_fa = os.getenv('PASSWORD_2FA')  # Add 2FA password
+        self.accounts = accounts if accounts is not None else load_accounts(session_name)
 
         # Set default values
-        self.session_name = session_name
         self.batch_size = 100
-        self.rate_limit_delay = 1.5
+        # The pace of the former fixed 1.5 s delay between pages; raise it only with measurements of the flood limits
+        self.max_requests_per_second = 1 / 1.5
+        self.commit_every = 10
 
         # Initialize the database and table
-        self.db = MessageDatabase('data/telegram_data.db')
+        self.db = db if db is not None else MessageDatabase('data/telegram_data.db')
         self.table = table_name
         self.db.create_table(self.table)  # This call will create the table if it doesn't exist already
+        self.db.create_sync_state_table()
+
+        # A single Telegram client per account is shared by all (possibly concurrent) extractions of that
+        # account, since several clients must not use the same session file at the same time
+        self._clients: List[Optional[TelegramClient]] = [None] * len(self.accounts)
+        self._client_locks = [asyncio.Lock() for _ in self.accounts]
+        # Flood limits are per account, so each account has its own limiter
+        self._rate_limiters = [RateLimiter(self.max_requests_per_second) for _ in self.accounts]
+
+        # All database work runs on one dedicated thread, so the (blocking) sqlite3 calls do not stall
+        # the event loop and the shared connection is never used by two threads at once
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
 
-    @property
-    async def connect_client(self) -> TelegramClient:
+    async def connect_client(self, account_index: int = 0) -> TelegramClient:
         """
-        Connects to the Telegram client using the provided session name, API ID, and API hash.
+        Returns the shared Telegram client of an account, connecting it on first use.
 
-        Starts the client with the phone number and two-factor authentication password.
-        Checks if the user is authorized and logs the connection status.
+        Connects to the Telegram client using the account's session name, API ID, and API hash,
+        starts it with the phone number and two-factor authentication password,
+        checks if the user is authorized and logs the connection status.
+        Concurrent callers wait for the same connection instead of opening their own.
+
+        Args:
+            account_index (int, optional): The index of the account in accounts. Defaults to 0.
 
         Returns:
             TelegramClient: The connected Telegram client.
@@ -78,266 +538,122 @@ class TelegramExtractor:
         Raises:
             Exception: If authentication with Telegram fails.
         """
-        client = TelegramClient(self.session_name, self.api_id, self.api_hash)
-        await client.start(phone=self.phone, password=self.two_fa)
+        async with self._client_locks[account_index]:
+            if self._clients[account_index] is None:
+                account = self.accounts[account_index]
+                client = TelegramClient(account.session_name, account.api_id, account.api_hash)
+                await client.start(phone=account.phone, password=account.two_fa)
+
+                if not await client.is_user_authorized():
+                    logger.error(f"Failed to authenticate with Telegram (session '{account.session_name}')")
+                    logger.exception("Authentication failed")
+                    raise Exception("Authentication failed")
+
+                logger.info(f"Successfully connected to Telegram (session '{account.session_name}')")
+                self._clients[account_index] = client
+        return self._clients[account_index]
+
+    async def start(self):
+        """
+        Connects the clients of all the accounts up front (concurrently), so every extraction reuses an
+        already authorized connection instead of the first extraction of each account paying for the handshake.
+        """
+        await asyncio.gather(*(self.connect_client(account_index) for account_index in range(len(self.accounts))))
 
-        if not await client.is_user_authorized():
-            logger.error("Failed to authenticate with Telegram")
-            logger.exception("Authentication failed")
-            raise Exception("Authentication failed")
+    async def close(self):
+        """
+        Disconnects the shared Telegram clients that were connected, and stops the database writer thread.
+        Meant to be called once, after all the extractions.
+        """
+        for account_index, client in enumerate(self._clients):
+            if client is not None:
+                await client.disconnect()
+                self._clients[account_index] = None
+                logger.info(f"Disconnected from Telegram (session '{self.accounts[account_index].session_name}')")
+        self._db_executor.shutdown()
 
-        logger.info("Successfully connected to Telegram")
-        return client
+    async def __aenter__(self):
+        await self.start()
+        return self
 
-    async def _handle_rate_limit(self, e: FloodWaitError):
-        """
-        Handles the rate limit error by logging a warning and waiting for the specified time.
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
 
-        Args:
-            e (FloodWaitError): The exception raised due to rate limiting, containing the wait time in seconds.
+    async def run_in_db_thread(self, func: Callable[..., Any], *args) -> Any:
         """
-        wait_time = e.seconds
-        logger.warning(f"Rate limited. Waiting {wait_time} seconds")
-        await asyncio.sleep(wait_time)
+        Runs a blocking database call on the database writer thread without blocking the event loop.
 
-    def _process_message(self, message, group_name) -> MessageData:
-        """
-        Processes a Telegram message and converts it into a MessageData object, including:
-          - Local timezone handling (Asia/Jerusalem)
-          - Extended forward info (channel ID, post author, date, etc.)
-          - Detailed media type/attributes (document, photo, poll, webpage, fallback)
-          - Emoji count using the emoji library
-          - Basic metrics (word count, day_of_week, etc.)
+        While extractions are running, every use of the database connection should go through here.
 
         Args:
-            message: The Telegram message object (from Telethon).
-            group_name (str): The name of the Telegram group/channel.
+            func (Callable[..., Any]): The function to run, e.g. a bound MessageDatabase method.
+            *args: The positional arguments to pass to func.
 
         Returns:
-            MessageData: An object containing the processed message data.
+            Any: The return value of func.
         """
+        return await asyncio.get_running_loop().run_in_executor(self._db_executor, func, *args)
 
-        # ----------------------------------------------------------------------------
-        # 1) Timezone Handling
-        # ----------------------------------------------------------------------------
-        # Telethon messages are often UTC or naive, so ensure we treat them as UTC:
-        utc_date = message.date.replace(tzinfo=timezone.utc)
-        # Convert to local time (Asia/Jerusalem):
-        local_tz = pytz.timezone("Asia/Jerusalem")
-        local_date = utc_date.astimezone(local_tz)
-
-        # ----------------------------------------------------------------------------
-        # 2) Extended Forward Info
-        # ----------------------------------------------------------------------------
-        forward_info = None
-        if message.fwd_from:
-            forward_info = {
-                "forwarded_from_id": str(message.fwd_from.from_id) if message.fwd_from.from_id else None,
-                "forwarded_channel_id": getattr(message.fwd_from, "channel_id", None),
-                "forwarded_channel_post": getattr(message.fwd_from, "channel_post", None),
-                "forwarded_post_author": getattr(message.fwd_from, "post_author", None),
-                "forwarded_date": (
-                    message.fwd_from.date.strftime("%Y-%m-%d %H:%M:%S")
-                    if message.fwd_from.date else None
-                ),
-            }
-
-        # also capture the "forwards" count:
-        forward_count = getattr(message, 'forwards', None)
-
-        # ----------------------------------------------------------------------------
-        # 3) Media Handling
-        # ----------------------------------------------------------------------------
-        media_type, media_attributes = self._process_message_with_media_types(message)
-
-        # ----------------------------------------------------------------------------
-        # 4) Reactions (if present)
-        # ----------------------------------------------------------------------------
-        reactions = None
-        if hasattr(message, 'reactions') and message.reactions:
-            reactions = []
-            for r in message.reactions.results:
-                if isinstance(r.reaction, ReactionEmoji):
-                    reactions.append({
-                        "emoji": r.reaction.emoticon,
-                        "count": r.count
-                    })
-                else:
-                    # Fallback for custom or unknown reaction type
-                    reactions.append({
-                        "emoji": str(r.reaction),
-                        "count": r.count
-                    })
-
-        # ----------------------------------------------------------------------------
-        # 5) Construct and Return the MessageData object
-        # ----------------------------------------------------------------------------
-
-        # Word count and emoji count:
-        text_content = message.message or ""
-
-        return MessageData(
-            group_name=group_name,
-            message_id=message.id,
-
-            # Local time with DST included:
-            utc_date=utc_date.strftime("%Y-%m-%d %H:%M:%S%z"),  # e.g. "2025-03-31 10:45:00+0000"
-            local_date=local_date.strftime("%Y-%m-%d %H:%M:%S%z"),  # e.g. "2025-03-31 13:45:00+0300"
-
-            text=text_content,
-            sender_id=message.sender_id,
-            reply_to_msg_id=message.reply_to_msg_id,
-
-            # Extended forward data:
-            forwarded_from=forward_info,
-            forward_count=forward_count,
-
-            # Media details:
-            media_type=media_type,
-            media_attributes=media_attributes,
-
-            # Entities:
-            entities=[
-                {
-                    "type": str(e.type) if hasattr(e, "type") else e.__class__.__name__,
-                    "offset": e.offset,
-                    "length": e.length
-                }
-                for e in message.entities
-            ] if message.entities else None,
-
-            # Views and reactions:
-            views=getattr(message, 'views', None),
-            reactions=reactions,
-
-            # Time-based fields (local):
-            hour=local_date.hour,
-            day_of_week=local_date.weekday(),
-            month=local_date.month,
-            week_of_year=int(local_date.strftime("%U")),
-
-            # Basic text metrics:
-            word_count=len(text_content.split()) if text_content else 0,
-            emoji_count=len(emoji.emoji_list(text_content)) if text_content else 0
-        )
-
-    def _process_message_with_media_types(self, message):
+    def _handle_rate_limit(self, e: FloodWaitError, account_index: int):
         """
-        Processes a Telegram message to handle several media types: Document, Photo, Poll, and WebPage.
+        Handles the rate limit error by logging a warning and pausing all the requests of the account
+        for the specified time.
 
         Args:
-            message: The Telegram message object to process.
+            e (FloodWaitError): The exception raised due to rate limiting, containing the wait time in seconds.
+            account_index (int): The index of the rate-limited account in accounts.
+        """
+        wait_time = e.seconds
+        logger.warning(f"Rate limited (session '{self.accounts[account_index].session_name}'). Waiting {wait_time} seconds")
+        self._rate_limiters[account_index].pause(wait_time)
 
-        Returns:
-            tuple: A tuple containing:
-                - media_type (str or None): The type of media (e.g., 'document', 'photo', 'poll', 'webpage') or None if no media.
-                - media_attributes (dict): A dictionary of media attributes specific to the media type.
+    async def _send(self, client: TelegramClient, account_index: int, request) -> Any:
         """
+        Sends a request through the account's rate limiter, retrying it after the wait of any FloodWaitError.
 
-        media_type = None
-        media_attributes = {}
-
-        if not message.media:
-            return media_type, media_attributes
-
-        # Identify media type
-        if isinstance(message.media, MessageMediaDocument) and message.document:
-            media_type = "document"
-
-            # Extract common fields
-            media_attributes["document_id"] = message.document.id
-            media_attributes["mime_type"] = getattr(message.document, "mime_type", None)
-            media_attributes["size"] = getattr(message.document, "size", None)
-
-            # Attempt to find a filename attribute (if any)
-            filename_attr = next(
-                (
-                    attr
-                    for attr in message.document.attributes
-                    if isinstance(attr, DocumentAttributeFilename)
-                ),
-                None
-            )
-            if filename_attr:
-                media_attributes["filename"] = filename_attr.file_name
-
-        elif isinstance(message.media, MessageMediaPhoto) and message.photo:
-            media_type = "photo"
-            media_attributes["photo_id"] = message.photo.id
-            media_attributes["width"] = getattr(message.photo, "w", None)
-            media_attributes["height"] = getattr(message.photo, "h", None)
-
-        if isinstance(message.media, MessageMediaPoll) and message.media.poll:
-            media_type = "poll"
-            poll_obj = message.media.poll
-
-            # poll_obj.question might be TextWithEntities or a regular string.
-            question_text = poll_obj.question
-            if hasattr(question_text, "text"):
-                # If it's TextWithEntities, grab just the text
-                question_text = question_text.text
-
-            media_attributes["question"] = question_text
-            media_attributes["multiple_choice"] = poll_obj.multiple_choice
-            media_attributes["quiz"] = poll_obj.quiz
-
-            # Each answer might also contain a text field that’s non-serializable.
-            answers_list = []
-            for answer in poll_obj.answers:
-                ans_text = answer.text
-                if hasattr(ans_text, "text"):
-                    ans_text = ans_text.text
-
-                answers_list.append({
-                    "text": ans_text,
-                    "option": answer.option.hex()  # raw bytes -> hex
-                })
-            media_attributes["answers"] = answers_list
-
-        elif isinstance(message.media, MessageMediaWebPage) and message.media.webpage:
-            media_type = "webpage"
-            web_page = message.media.webpage
-
-            # If the webpage is actually WebPageEmpty or another minimal type, skip the rest
-            if type(web_page).__name__ == "WebPageEmpty":
-                # Possibly store minimal or fallback data
-                media_attributes["raw_object"] = str(web_page)
-                return media_type, media_attributes
-
-            # Otherwise, proceed (this implies we have a "real" WebPage)
-            media_attributes["url"] = getattr(web_page, "url", None)
-            media_attributes["site_name"] = getattr(web_page, "site_name", None)
-            media_attributes["title"] = getattr(web_page, "title", None)
-            media_attributes["description"] = getattr(web_page, "description", None)
-            media_attributes["author"] = getattr(web_page, "author", None)
-            media_attributes["embed_url"] = getattr(web_page, "embed_url", None)
-            media_attributes["embed_type"] = getattr(web_page, "embed_type", None)
-
-            # If the webpage includes a photo, document, etc., check for existence
-            if getattr(web_page, "photo", None):
-                media_attributes["photo_id"] = web_page.photo.id
-            if getattr(web_page, "document", None):
-                media_attributes["document_id"] = web_page.document.id
-
-        else:
-            # Fallback case: unknown or unhandled media type
-            media_type = type(message.media).__name__
-            media_attributes["raw_object"] = str(message.media)
+        Args:
+            client (TelegramClient): The connected Telegram client.
+            account_index (int): The index of the client's account in accounts, whose rate limiter to use.
+            request: The Telegram API request to send.
 
-        return media_type, media_attributes
+        Returns:
+            Any: The result of the request.
+        """
+        while True:
+            try:
+                await self._rate_limiters[account_index].acquire()
+                return await client(request)
+            except FloodWaitError as e:
+                self._handle_rate_limit(e, account_index)
 
-    async def extract_messages(self, group: str, start_date: datetime, end_date: datetime) -> list[MessageData] | list[Any]:
+    async def extract_messages(self, group: str, start_date: datetime, end_date: datetime, account_index: int = 0) -> int:
         """
         Extracts messages from a specified Telegram group within a date range and stores them in a SQLite database.
 
+        Fetching pages from Telegram (_fetch_pages) and processing and writing them on the database writer thread
+        (_store_pages) run concurrently, connected by a small queue. The messages are written to the database
+        page by page and are not kept in memory.
+
+        When a channel was already extracted up to the present (see SyncState) and the requested range starts after
+        that point and reaches the present, only the newer messages are fetched, via GetChannelDifferenceRequest
+        (_fetch_difference). Backfills of earlier ranges page through the history as usual.
+
+        Errors are logged rather than raised, and 0 is returned. The pages stored before the error are kept and
+        committed, not rolled back: the open transaction is shared with the concurrent extractions of other groups,
+        so a rollback would discard their rows as well. The history is paged newest first, so the kept rows are the
+        newest part of the range. To resume, extract the group again with end_date before its oldest stored message
+        (storing a message twice fails on the primary key). A history extraction saves the group's SyncState only
+        with its last page, so a failed one leaves no state behind; a difference fetch saves the state with every
+        page, so the next run continues after the last stored page.
+
         Args:
             group (str): The name of the Telegram group to extract messages from.
             start_date (datetime): The start date to extract messages from.
             end_date (datetime): The end date to extract messages until.
+            account_index (int, optional): The index of the account (in accounts) to extract with. Defaults to 0.
 
         Returns:
-            list[MessageData] | list[Any]: A list of MessageData objects containing the extracted messages,
-                or an empty list if an error occurs.
+            int: The number of extracted messages (which are not kept in memory), or 0 if an error occurs.
         """
         logger.info(f"\nStarting messages extraction for group '{group}' from {start_date} to {end_date}")
 
@@ -354,81 +670,246 @@ class TelegramExtractor:
         if start_date.tzinfo is None:
             # If no tz is set, assume user meant local time – but we must choose how to handle. Typically, you'd do:
             logger.warning("start_date is naive; assuming Asia/Jerusalem.")
-            start_date = pytz.timezone("Asia/Jerusalem").localize(start_date)
+            start_date = _LOCAL_TZ.localize(start_date)
         if end_date.tzinfo is None:
             logger.warning("end_date is naive; assuming Asia/Jerusalem.")
-            end_date = pytz.timezone("Asia/Jerusalem").localize(end_date)
+            end_date = _LOCAL_TZ.localize(end_date)
         # Convert them to UTC
-        start_date_utc = start_date.astimezone(pytz.utc)
-        end_date_utc = end_date.astimezone(pytz.utc)
+        start_date_utc = start_date.astimezone(_UTC)
+        end_date_utc = end_date.astimezone(_UTC)
 
         # --------------------------------------------------------------------------
         # 2) Connect to Telegram
         # --------------------------------------------------------------------------
         # async with TelegramClient(self.session_name, self.api_id, self.api_hash) as client:
-        client = await self.connect_client
-        async with client:
-            try:
-                entity = await client.get_entity(group)
-                offset_id = 0
-                all_messages: List[MessageData] = []
-
-                while True:
-                    try:
-                        logger.debug(f"Requesting batch of up to {self.batch_size} messages with offset_id={offset_id}")
-                        history = await client(GetHistoryRequest(
-                            peer=entity,
-                            offset_id=offset_id,
-                            offset_date=None,
-                            add_offset=0,
-                            limit=self.batch_size,
-                            max_id=0,
-                            min_id=0,
-                            hash=0
-                        ))
-
-                        if not history.messages:
-                            logger.info("No more messages returned by Telegram.")
-                            break
-
-                        logger.debug(f"Fetched {len(history.messages)} messages from Telegram API.")
-
-                        # ------------------------------------------------------------------
-                        # 3) Filter the Telegram messages by UTC
-                        # ------------------------------------------------------------------
-                        # Telethon message dates are naive or effectively in UTC.
-                        # We attach tzinfo=UTC and compare with start_date_utc/end_date_utc.
-                        valid_msgs = []
-                        for msg in history.messages:
-                            msg_utc_date = msg.date.replace(tzinfo=pytz.utc)  # ensure it's tz-aware
-                            if start_date_utc <= msg_utc_date <= end_date_utc:
-                                valid_msgs.append(msg)
-
-                        # Process and insert them
-                        if valid_msgs:
-                            processed = [self._process_message(m, group) for m in valid_msgs]
-                            all_messages.extend(processed)
-
-                            self.db.insert_messages(processed, table_name=self.table)
-                            logger.info(f"Inserted {len(processed)} messages of group {group}; total {len(all_messages)} in {self.table}")
-
-                        # If the last message's date is older than start_date_utc, we can stop because all next messages will be older too.
-                        last_msg_utc_date = history.messages[-1].date.replace(tzinfo=pytz.utc)
-                        if last_msg_utc_date < start_date_utc:
-                            logger.info("Reached messages older than the start_date, stopping extraction.")
-                            break
-
-                        offset_id = history.messages[-1].id
-                        await asyncio.sleep(self.rate_limit_delay)
-
-                    except FloodWaitError as e:
-                        await self._handle_rate_limit(e)
+        client = await self.connect_client(account_index)
+        try:
+            entity = await client.get_entity(group)
+            sync_state = (
+                await self.run_in_db_thread(self.db.get_sync_state, group) if isinstance(entity, Channel) else None
+            )
+
+            # The next page is fetched while the previous ones are processed and stored; the bounded
+            # queue keeps the fetching at most a few pages ahead of the database
+            pages: asyncio.Queue = asyncio.Queue(maxsize=4)
+            if (sync_state is not None and sync_state.channel_id == entity.id
+                    and start_date_utc >= datetime.fromisoformat(sync_state.last_date)
+                    and end_date_utc >= datetime.now(_UTC)):
+                logger.info(f"Fetching the updates of group '{group}' since {sync_state.last_date}")
+                fetch = self._fetch_difference(
+                    client, account_index, entity, sync_state, start_date_utc, end_date_utc, pages
+                )
+            else:
+                fetch = self._fetch_pages(client, account_index, entity, group, start_date_utc, end_date_utc, pages)
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(fetch)
+                store_task = task_group.create_task(self._store_pages(group, pages))
+            total_messages = store_task.result()
+
+            await self.run_in_db_thread(self.db.commit)
+            logger.info(f"*** Finished processing {total_messages} total messages from group '{group}'")
+            return total_messages
+
+        except Exception as e:
+            logger.error(f"Error extracting messages: {e}")
+            logger.exception("Error extracting messages")
+            # Keep the rows inserted so far: the transaction is shared with the concurrent extractions
+            # of other groups, so rolling it back would discard their rows as well
+            await self.run_in_db_thread(self.db.commit)
+            return 0
+
+    async def _fetch_pages(self, client: TelegramClient, account_index: int, entity, group: str,
+                           start_date_utc: datetime, end_date_utc: datetime, pages: asyncio.Queue, min_id: int = 0):
+        """
+        Producer of extract_messages: pages through the group's history (newest first) and puts the messages
+        of every page that fall within the date range on the queue, followed by None once done.
+
+        If the range reaches the present and the group is a channel, the channel's update state is captured
+        before paging and put on the queue after the last page, so the next extraction can continue from it.
+
+        Args:
+            client (TelegramClient): The connected Telegram client.
+            account_index (int): The index of the client's account in accounts, whose rate limiter to use.
+            entity: The resolved Telegram entity of the group.
+            group (str): The name of the Telegram group.
+            start_date_utc (datetime): The (UTC) start date to extract messages from.
+            end_date_utc (datetime): The (UTC) end date to extract messages until.
+            pages (asyncio.Queue): The queue to put the (messages, sync state) pages on.
+            min_id (int, optional): Only fetch messages with a greater ID. Defaults to 0.
+        """
+        # The pts is captured before paging, so the messages sent while paging are fetched again as updates
+        # next time (and skipped there by their ID) rather than missed
+        pts = None
+        if isinstance(entity, Channel) and end_date_utc >= datetime.now(_UTC):
+            full_channel = await self._send(client, account_index, GetFullChannelRequest(entity))
+            pts = full_channel.full_chat.pts
+            captured_at = datetime.now(_UTC)
+        newest_id = min_id
+
+        offset_id = 0
+        # The first page starts at end_date_utc instead of at the newest message: Telegram returns the messages
+        # sent before offset_date, so a second is added to keep those of end_date_utc's own second. Later pages
+        # continue from offset_id.
+        first_offset_date = end_date_utc + timedelta(seconds=1)
+
+        while True:
+            logger.debug(f"Requesting batch of up to {self.batch_size} messages with offset_id={offset_id}")
+            history = await self._send(client, account_index, GetHistoryRequest(
+                peer=entity,
+                offset_id=offset_id,
+                offset_date=None if offset_id else first_offset_date,
+                add_offset=0,
+                limit=self.batch_size,
+                max_id=0,
+                min_id=min_id,
+                hash=0
+            ))
+
+            if not history.messages:
+                logger.info(f"No more messages returned by Telegram for group '{group}'.")
+                break
+
+            logger.debug(f"Fetched {len(history.messages)} messages from Telegram API.")
+            newest_id = max(newest_id, history.messages[0].id)
+
+            # ------------------------------------------------------------------
+            # Filter the Telegram messages by UTC
+            # ------------------------------------------------------------------
+            # Telethon message dates are naive or effectively in UTC.
+            # We attach tzinfo=UTC and compare with start_date_utc/end_date_utc.
+            valid_msgs = []
+            for msg in history.messages:
+                msg_utc_date = msg.date.replace(tzinfo=_UTC)  # ensure it's tz-aware
+                if start_date_utc <= msg_utc_date <= end_date_utc:
+                    valid_msgs.append(msg)
+
+            if valid_msgs:
+                await pages.put((valid_msgs, None))
+
+            # If the last message's date is older than start_date_utc, we can stop because all next messages will be older too.
+            last_msg_utc_date = history.messages[-1].date.replace(tzinfo=_UTC)
+            if last_msg_utc_date < start_date_utc:
+                logger.info(f"Reached messages older than the start_date in group '{group}', stopping extraction.")
+                break
+
+            offset_id = history.messages[-1].id
+
+        # Saved only if no message after end_date_utc could have been sent before the pts was captured
+        if pts is not None and end_date_utc >= captured_at:
+            await pages.put(([], SyncState(group, entity.id, pts, captured_at.isoformat(), newest_id)))
+        await pages.put(None)
+
+    async def _fetch_difference(self, client: TelegramClient, account_index: int, entity, sync_state: SyncState,
+                                start_date_utc: datetime, end_date_utc: datetime, pages: asyncio.Queue):
+        """
+        Producer of extract_messages for a channel with a saved sync state: fetches the channel's new messages
+        since the state via GetChannelDifferenceRequest and puts them on the queue with the updated state,
+        followed by None once done.
+
+        If Telegram reports too many updates since the state, falls back to paging through the history
+        of the messages newer than the last extracted one.
+
+        Args:
+            client (TelegramClient): The connected Telegram client.
+            account_index (int): The index of the client's account in accounts, whose rate limiter to use.
+            entity: The resolved Telegram entity of the channel.
+            sync_state (SyncState): The saved state of the channel.
+            start_date_utc (datetime): The (UTC) start date to extract messages from.
+            end_date_utc (datetime): The (UTC) end date to extract messages until.
+            pages (asyncio.Queue): The queue to put the (messages, sync state) pages on.
+        """
+        group = sync_state.group_name
+        pts = sync_state.pts
+        last_msg_id = sync_state.last_msg_id
+
+        while True:
+            difference = await self._send(client, account_index, GetChannelDifferenceRequest(
+                channel=entity,
+                filter=ChannelMessagesFilterEmpty(),
+                pts=pts,
+                limit=self.batch_size,
+                force=True
+            ))
+
+            if isinstance(difference, ChannelDifferenceTooLong):
+                logger.info(f"Too many updates in group '{group}' since {sync_state.last_date}, paging through the history instead.")
+                await self._fetch_pages(
+                    client, account_index, entity, group, start_date_utc, end_date_utc, pages, min_id=last_msg_id
+                )
+                return
+
+            valid_msgs = []
+            newest_id = last_msg_id
+            if not isinstance(difference, ChannelDifferenceEmpty):
+                for msg in difference.new_messages:
+                    # Messages already extracted before the state was saved may be sent again
+                    if isinstance(msg, MessageEmpty) or msg.id <= last_msg_id:
                         continue
+                    newest_id = max(newest_id, msg.id)
+                    if start_date_utc <= msg.date.replace(tzinfo=_UTC) <= end_date_utc:
+                        valid_msgs.append(msg)
+            last_msg_id = newest_id
+
+            pts = difference.pts
+            await pages.put((valid_msgs, SyncState(
+                group, entity.id, pts, datetime.now(_UTC).isoformat(), last_msg_id
+            )))
 
-                logger.info(f"*** Finished processing {len(all_messages)} total messages from group '{group}'")
-                return all_messages
+            if difference.final:
+                break
 
-            except Exception as e:
-                logger.error(f"Error extracting messages: {e}")
-                logger.exception("Error extracting messages")
-                return []
+        await pages.put(None)
+
+    async def _store_pages(self, group: str, pages: asyncio.Queue) -> int:
+        """
+        Consumer of extract_messages: processes and inserts the pages of messages taken from the queue (and
+        the sync state that comes with them, if any) on the database writer thread, until it takes None.
+
+        Args:
+            group (str): The name of the Telegram group.
+            pages (asyncio.Queue): The queue to take the pages of messages from.
+
+        Returns:
+            int: The number of inserted messages.
+        """
+        total_messages = 0
+        inserted_pages = 0
+
+        while (page := await pages.get()) is not None:
+            valid_msgs, sync_state = page
+            inserted_pages += 1
+            inserted = await self.run_in_db_thread(
+                self._store_messages, valid_msgs, group, sync_state, inserted_pages % self.commit_every == 0
+            )
+            total_messages += inserted
+            logger.info(f"Inserted {inserted} messages of group {group}; total {total_messages} in {self.table}")
+
+        return total_messages
+
+    def _store_messages(self, messages: list, group_name: str, sync_state: Optional[SyncState], commit: bool) -> int:
+        """
+        Processes a page of Telegram messages and inserts them into the database. Runs on the database writer thread.
+
+        The pages are inserted inside one transaction instead of committing each of them, and committed
+        periodically so a long crawl does not keep the write lock to itself. The sync state is saved in
+        the same transaction, so it is never committed ahead of the messages it covers.
+
+        Args:
+            messages (list): The Telegram message objects (from Telethon) to store.
+            group_name (str): The name of the Telegram group/channel.
+            sync_state (Optional[SyncState]): The group's sync state after these messages, if any.
+            commit (bool): Whether to commit the open transaction after the insert.
+
+        Returns:
+            int: The number of inserted messages.
+        """
+        # The transaction may have been committed by a concurrent extraction
+        self.db.begin_transaction()
+        inserted = self.db.insert_messages(
+            (_process_message(m, group_name) for m in messages), table_name=self.table
+        )
+        if sync_state is not None:
+            self.db.save_sync_state(sync_state)
+        if commit:
+            self.db.commit()
+        return inserted
@@ -0,0 +1,68 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+from time_periods_parser import extract_time_periods
+
+
+def extract_periods(tmp_path, titles):
+    """Run extract_time_periods on the given titles, and map each title with a period to its output columns."""
+    input_csv = tmp_path / 'titles.csv'
+    output_csv = tmp_path / 'periods.csv'
+    with open(input_csv, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['level', 'title', 'indented_title'])
+        writer.writerows((2, title, title) for title in titles)
+
+    extract_time_periods(input_csv, output_csv)
+
+    with open(output_csv, encoding='utf-8', newline='') as f:
+        return {
+            row['title']: (row['period'], row['start_date'], row['end_date'], row['duration_days'])
+            for row in csv.DictReader(f)
+        }
+
+
+# Titles and the periods the original one-search-per-pattern loop extracted for them
+BASELINE_PERIODS = {
+    'Background': None,
+    'October 2023': ('October 2023', '2023-10-01', '2023-10-31', '31'),
+    '7 October 2023': ('October 2023', '2023-10-01', '2023-10-31', '31'),
+    'October–November 2023': ('November 2023', '2023-11-01', '2023-11-30', '30'),
+    'December 2023 – January 2024': ('December 2023', '2023-12-01', '2023-12-31', '31'),
+    '7 October attack and response (October 2023)': ('October 2023', '2023-10-01', '2023-10-31', '31'),
+    'Ceasefire (19 January 2025)': ('January 2025', '2025-01-01', '2025-01-31', '31'),
+    'Attack on 29 February 2023': ('February 2023', '2023-02-01', '2023-02-28', '28'),
+    '29 February – 3 March 2023': ('March 2023', '2023-03-01', '2023-03-31', '31'),
+}
+
+
+@pytest.mark.parametrize('title, period', BASELINE_PERIODS.items())
+def test_periods_match_the_baseline(tmp_path, title, period):
+    assert extract_periods(tmp_path, [title]).get(title) == period
+
+
+def test_yearless_day_gets_the_current_year(tmp_path):
+    year = datetime.now().year
+    assert extract_periods(tmp_path, ['Aftermath of 7 October'])['Aftermath of 7 October'] == (
+        '7 October ', f'{year}-10-07', f'{year}-10-07', '1'
+    )
+
+
+@pytest.mark.parametrize('title, period', [
+    ('Ground invasion (27 October – 23 November 2023)',
+     ('27 October - 23 November 2023', '2023-10-27', '2023-11-23', '28')),
+    ('Humanitarian pause (24 November – 1 December 2023)',
+     ('24 November - 1 December 2023', '2023-11-24', '2023-12-01', '8')),
+    ('30 December 2023 – 5 January 2024',
+     ('30 December 2023 - 5 January 2024', '2023-12-30', '2024-01-05', '7')),
+    ('30 December – 5 January 2024',
+     ('30 December - 5 January 2024', '2023-12-30', '2024-01-05', '7')),
+])
+def test_day_ranges(tmp_path, title, period):
+    assert extract_periods(tmp_path, [title])[title] == period
+
+
+def test_nonexistent_yearless_day_is_skipped(tmp_path):
+    assert extract_periods(tmp_path, ['Attack on 30 February']) == {}
@@ -0,0 +1,28 @@
+import wikipedia_dates_parser
+from wikipedia_dates_parser import extract_wikipedia_dates
+
+
+class FakeResponse:
+    """A successful HTTP response with a fixed body."""
+
+    def __init__(self, html):
+        self.status_code = 200
+        self.content = html.encode('utf-8')
+
+
+def extract_dates_from_html(monkeypatch, html):
+    """Run extract_wikipedia_dates on the given page markup instead of a fetched page."""
+    monkeypatch.setattr(wikipedia_dates_parser._SESSION, 'get', lambda url, timeout: FakeResponse(html))
+    return {date for date, context in extract_wikipedia_dates('https://en.wikipedia.org/wiki/Test')}
+
+
+def test_dates_split_across_tags_are_found(monkeypatch):
+    html = (
+        '<html><body><div id="mw-content-text"><div class="mw-parser-output">'
+        '<p>On <a>October 7</a>, 2023 it began. On <b>8</b>.10.2023 more. By <a>7 October</a> 2023 done.</p>'
+        '</div></div></body></html>'
+    )
+
+    assert extract_dates_from_html(monkeypatch, html) == {
+        'October 7, 2023', '7 October 2023', 'October 2023', '8.10.2023'
+    }
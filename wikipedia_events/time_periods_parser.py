@@ -1,7 +1,56 @@
+import calendar
 import csv
 import re
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime
+from operator import itemgetter
+
+# Month name -> month number; titles are matched case-insensitively, so look names up with .title()
+_MONTH_NUMBERS = {
+    name: number for number, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June',
+         'July', 'August', 'September', 'October', 'November', 'December'], 1
+    )
+}
+
+_MONTH = '|'.join(_MONTH_NUMBERS)
+
+# Every period pattern contains a month name, so titles without one can skip the regex
+_MONTHS_LOWER = tuple(name.lower() for name in _MONTH_NUMBERS)
+
+# Non-title rows or irrelevant sections
+SKIPPED_TITLES = frozenset({'See also', 'Notes', 'References', 'External links'})
+
+# Patterns to match different date formats. The group names carry a per-pattern suffix, since they are
+# fused into a single regex below and named groups must be unique.
+PERIOD_PATTERNS = [
+    # Pattern for date ranges with days: "27 October – 23 November 2023" or "30 December 2023 – 5 January 2024"
+    rf'(?P<day1_e>\d{{1,2}})\s+(?P<month1_e>{_MONTH})(?:\s+(?P<year1_e>\d{{4}}))?\s*[-–]\s*'
+    rf'(?P<day2_e>\d{{1,2}})\s+(?P<month2_e>{_MONTH})\s+(?P<year2_e>\d{{4}})',
+
+    # Pattern for dates with month and year: "October 2023"
+    rf'(?P<month_a>{_MONTH})\s+(?P<year_a>\d{{4}})',
+
+    # Pattern for date ranges with months and years: "October–November 2023"
+    rf'(?P<month1_b>{_MONTH})[-–](?P<month2_b>{_MONTH})\s+(?P<year_b>\d{{4}})',
+
+    # Pattern for date ranges with month-year to month-year: "December 2023 – January 2024"
+    rf'(?P<month1_c>{_MONTH})\s+(?P<year1_c>\d{{4}})[-–]\s*(?P<month2_c>{_MONTH})\s+(?P<year2_c>\d{{4}})',
+
+    # Pattern for full dates: "7 October" or "7 October 2023"
+    rf'(?P<day_d>\d{{1,2}})\s+(?P<month_d>{_MONTH})(?:\s+(?P<year_d>\d{{4}}))?',
+]
+
+# Compiled once, and matched with a single call per title. Each alternative skips ahead lazily to the leftmost
+# occurrence of its pattern, and the alternatives are tried in list order, so, as with one re.search per
+# pattern, the first pattern found anywhere in the title wins (not the leftmost match of any pattern).
+PERIOD_REGEX = re.compile('|'.join(f'.*?(?:{pattern})' for pattern in PERIOD_PATTERNS), re.IGNORECASE | re.DOTALL)
+
+# The same without the day patterns, for titles whose matched day does not exist ("29 February – 3 March 2023")
+MONTH_PERIOD_REGEX = re.compile(
+    '|'.join(f'.*?(?:{pattern})' for pattern in PERIOD_PATTERNS if '(?P<day' not in pattern), re.IGNORECASE | re.DOTALL
+)
+
 
 def extract_time_periods(input_csv, output_csv):
     """
@@ -11,59 +60,57 @@ def extract_time_periods(input_csv, output_csv):
         input_csv (str): Path to the input CSV file with Wikipedia section titles
         output_csv (str): Path to save the output CSV with extracted time periods
     """
-    # Patterns to match different date formats
-    patterns = [
-        # Pattern for dates with month and year: "October 2023"
-        r'(?P<month>January|February|March|April|May|June|July|August|September|October|November|December)\s+(?P<year>\d{4})',
-
-        # Pattern for date ranges with months and years: "October–November 2023"
-        r'(?P<month1>January|February|March|April|May|June|July|August|September|October|November|December)[-–](?P<month2>January|February|March|April|May|June|July|August|September|October|November|December)\s+(?P<year>\d{4})',
-
-        # Pattern for date ranges with month-year to month-year: "December 2023 – January 2024"
-        r'(?P<month1>January|February|March|April|May|June|July|August|September|October|November|December)\s+(?P<year1>\d{4})[-–]\s*(?P<month2>January|February|March|April|May|June|July|August|September|October|November|December)\s+(?P<year2>\d{4})',
-
-        # Pattern for full dates: "7 October" or "7 October 2023"
-        r'(?P<day>\d{1,2})\s+(?P<month>January|February|March|April|May|June|July|August|September|October|November|December)(?:\s+(?P<year>\d{4}))?',
-    ]
-
-    # Read the input CSV
+    # Read the input CSV; rows are collected as (sort key, row) pairs so the sort compares plain strings
     titles_with_periods = []
     with open(input_csv, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+
+        # Resolve the needed columns once from the header, then read the rows as plain lists
+        header = next(reader)
+        title_idx = header.index('title')
+        level_idx = header.index('level')
+        indented_title_idx = header.index('indented_title')
+
         for row in reader:
-            title = row['title']
+            title = row[title_idx]
 
             # Skip non-title rows or irrelevant sections
-            if title in ['See also', 'Notes', 'References', 'External links']:
+            if title in SKIPPED_TITLES:
+                continue
+
+            # Cheap substring pre-check before the regex scan
+            lower_title = title.lower()
+            if not any(month in lower_title for month in _MONTHS_LOWER):
                 continue
 
             # Check if the title contains a time period
-            found_match = False
-            for pattern in patterns:
-                matches = re.search(pattern, title, re.IGNORECASE)
-                if matches:
-                    period_info = extract_period_info(matches)
-                    titles_with_periods.append({
-                        'title': title,
-                        'period': period_info['formatted_period'],
-                        'start_date': period_info['start_date'],
-                        'end_date': period_info['end_date'],
-                        'duration_days': period_info['duration_days'],
-                        'level': row['level'],
-                        'indented_title': row['indented_title']
-                    })
-                    found_match = True
-                    break
+            matches = PERIOD_REGEX.match(title)
+            period_info = extract_period_info(matches) if matches else None
+            # A day that does not exist falls back to the month-level periods of the title
+            if matches and period_info is None:
+                matches = MONTH_PERIOD_REGEX.match(title)
+                period_info = extract_period_info(matches) if matches else None
+            if period_info:
+                # In the order of the output columns
+                titles_with_periods.append((period_info['start_date'] or '9999-12-31', (
+                    title,
+                    period_info['formatted_period'],
+                    period_info['start_date'],
+                    period_info['end_date'],
+                    period_info['duration_days'],
+                    row[level_idx],
+                    row[indented_title_idx]
+                )))
 
     # Sort by chronological order if dates are available
-    titles_with_periods.sort(key=lambda x: x['start_date'] if x['start_date'] else '9999-12-31')
+    titles_with_periods.sort(key=itemgetter(0))
 
     # Write the output CSV
     with open(output_csv, 'w', encoding='utf-8', newline='') as f:
         fieldnames = ['title', 'period', 'start_date', 'end_date', 'duration_days', 'level', 'indented_title']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(titles_with_periods)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(map(itemgetter(1), titles_with_periods))
 
     return len(titles_with_periods)
 
@@ -73,20 +120,20 @@ def extract_period_info(matches):
     Extract structured period information from regex matches.
 
     Args:
-        matches: Regex match object containing date components
+        matches: PERIOD_REGEX or MONTH_PERIOD_REGEX match object containing date components; the pattern
+            that matched is identified by the suffix of its (non-None) named groups
 
     Returns:
-        dict: Structured period information
+        dict: Structured period information, or None if the matched day does not exist (e.g. "30 February")
     """
 
     # Convert month name to number
     def month_to_num(month_name):
-        if not month_name:
-            return None
-        try:
-            return datetime.strptime(month_name, '%B').month
-        except ValueError:
-            return None
+        return _MONTH_NUMBERS.get(month_name.title()) if month_name else None
+
+    # Check that a day exists in its month
+    def is_valid_day(year, month, day):
+        return 1 <= day <= calendar.monthrange(year, month)[1]
 
     # Initialize result dictionary
     result = {
@@ -96,97 +143,92 @@ def extract_period_info(matches):
         'duration_days': None
     }
 
-    # Get all matched groups
+    # Get all matched groups (the day groups are missing from MONTH_PERIOD_REGEX matches)
     match_dict = matches.groupdict()
 
+    # Case 0: Day range (day + month + optional year to day + month + year)
+    if match_dict.get('day1_e'):
+        day1 = int(match_dict['day1_e'])
+        month1 = month_to_num(match_dict['month1_e'])
+        day2 = int(match_dict['day2_e'])
+        month2 = month_to_num(match_dict['month2_e'])
+        year2 = int(match_dict['year2_e'])
+        start = f"{day1} {match_dict['month1_e']}"
+        if match_dict['year1_e']:
+            year1 = int(match_dict['year1_e'])
+            start = f"{start} {year1}"
+        else:
+            # Without its own year, the start day is in the end day's year, or the year before if the range
+            # crosses New Year ("30 December – 5 January 2024")
+            year1 = year2 - 1 if month1 > month2 else year2
+
+        if not (is_valid_day(year1, month1, day1) and is_valid_day(year2, month2, day2)):
+            return None
+
+        result['formatted_period'] = f"{start} - {day2} {match_dict['month2_e']} {year2}"
+        result['start_date'] = f"{year1}-{month1:02d}-{day1:02d}"
+        result['end_date'] = f"{year2}-{month2:02d}-{day2:02d}"
+        result['duration_days'] = (date(year2, month2, day2) - date(year1, month1, day1)).days + 1
+
     # Case 1: Full date (day + month + optional year)
-    if 'day' in match_dict and match_dict['day']:
-        day = int(match_dict['day'])
-        month = month_to_num(match_dict['month'])
-        year = int(match_dict['year']) if 'year' in match_dict and match_dict['year'] else datetime.now().year
+    elif match_dict.get('day_d'):
+        day = int(match_dict['day_d'])
+        month = month_to_num(match_dict['month_d'])
+        year = int(match_dict['year_d']) if match_dict['year_d'] else datetime.now().year
 
-        result[
-            'formatted_period'] = f"{day} {match_dict['month']} {year if 'year' in match_dict and match_dict['year'] else ''}"
+        if not is_valid_day(year, month, day):
+            return None
+
+        result['formatted_period'] = f"{day} {match_dict['month_d']} {match_dict['year_d'] or ''}"
         result['start_date'] = f"{year}-{month:02d}-{day:02d}"
         result['end_date'] = result['start_date']
         result['duration_days'] = 1
 
     # Case 2: Month + Year
-    elif 'month' in match_dict and match_dict['month'] and 'year' in match_dict and match_dict['year']:
-        month = month_to_num(match_dict['month'])
-        year = int(match_dict['year'])
+    elif match_dict['month_a']:
+        month = month_to_num(match_dict['month_a'])
+        year = int(match_dict['year_a'])
 
         # Get the last day of the month
-        if month == 12:
-            next_month_year = year + 1
-            next_month = 1
-        else:
-            next_month_year = year
-            next_month = month + 1
-
-        last_day = (datetime(next_month_year, next_month, 1) - timedelta(days=1)).day
+        last_day = calendar.monthrange(year, month)[1]
 
-        result['formatted_period'] = f"{match_dict['month']} {year}"
+        result['formatted_period'] = f"{match_dict['month_a']} {year}"
         result['start_date'] = f"{year}-{month:02d}-01"
         result['end_date'] = f"{year}-{month:02d}-{last_day}"
-
-        # Calculate duration
-        start_date = datetime.strptime(result['start_date'], '%Y-%m-%d')
-        end_date = datetime.strptime(result['end_date'], '%Y-%m-%d')
-        result['duration_days'] = (end_date - start_date).days + 1
+        result['duration_days'] = last_day
 
     # Case 3: Month Range in same year
-    elif 'month1' in match_dict and match_dict['month1'] and 'month2' in match_dict and match_dict[
-        'month2'] and 'year' in match_dict and match_dict['year']:
-        month1 = month_to_num(match_dict['month1'])
-        month2 = month_to_num(match_dict['month2'])
-        year = int(match_dict['year'])
+    elif match_dict['month1_b']:
+        month1 = month_to_num(match_dict['month1_b'])
+        month2 = month_to_num(match_dict['month2_b'])
+        year = int(match_dict['year_b'])
 
         # Get the last day of the end month
-        if month2 == 12:
-            next_month_year = year + 1
-            next_month = 1
-        else:
-            next_month_year = year
-            next_month = month2 + 1
-
-        last_day = (datetime(next_month_year, next_month, 1) - datetime.timedelta(days=1)).day
+        last_day = calendar.monthrange(year, month2)[1]
 
-        result['formatted_period'] = f"{match_dict['month1']} - {match_dict['month2']} {year}"
+        result['formatted_period'] = f"{match_dict['month1_b']} - {match_dict['month2_b']} {year}"
         result['start_date'] = f"{year}-{month1:02d}-01"
         result['end_date'] = f"{year}-{month2:02d}-{last_day}"
 
         # Calculate duration
-        start_date = datetime.strptime(result['start_date'], '%Y-%m-%d')
-        end_date = datetime.strptime(result['end_date'], '%Y-%m-%d')
-        result['duration_days'] = (end_date - start_date).days + 1
+        result['duration_days'] = (date(year, month2, last_day) - date(year, month1, 1)).days + 1
 
     # Case 4: Full date range (month-year to month-year)
-    elif 'month1' in match_dict and match_dict['month1'] and 'year1' in match_dict and match_dict[
-        'year1'] and 'month2' in match_dict and match_dict['month2'] and 'year2' in match_dict and match_dict['year2']:
-        month1 = month_to_num(match_dict['month1'])
-        year1 = int(match_dict['year1'])
-        month2 = month_to_num(match_dict['month2'])
-        year2 = int(match_dict['year2'])
+    elif match_dict['month1_c']:
+        month1 = month_to_num(match_dict['month1_c'])
+        year1 = int(match_dict['year1_c'])
+        month2 = month_to_num(match_dict['month2_c'])
+        year2 = int(match_dict['year2_c'])
 
         # Get the last day of the end month
-        if month2 == 12:
-            next_month_year = year2 + 1
-            next_month = 1
-        else:
-            next_month_year = year2
-            next_month = month2 + 1
-
-        last_day = (datetime(next_month_year, next_month, 1) - datetime.timedelta(days=1)).day
+        last_day = calendar.monthrange(year2, month2)[1]
 
-        result['formatted_period'] = f"{match_dict['month1']} {year1} - {match_dict['month2']} {year2}"
+        result['formatted_period'] = f"{match_dict['month1_c']} {year1} - {match_dict['month2_c']} {year2}"
         result['start_date'] = f"{year1}-{month1:02d}-01"
         result['end_date'] = f"{year2}-{month2:02d}-{last_day}"
 
         # Calculate duration
-        start_date = datetime.strptime(result['start_date'], '%Y-%m-%d')
-        end_date = datetime.strptime(result['end_date'], '%Y-%m-%d')
-        result['duration_days'] = (end_date - start_date).days + 1
+        result['duration_days'] = (date(year2, month2, last_day) - date(year1, month1, 1)).days + 1
 
     return result
 
@@ -1,12 +1,48 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import csv
-import nltk
-from nltk.tokenize import sent_tokenize
-
-# Download the necessary NLTK data for sentence tokenization
-nltk.download('punkt', quiet=True)
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, List, Set
+
+# One HTTP session for all requests, so the connection (and its TLS handshake) is reused between fetches.
+# Responses are requested compressed; brotli is not advertised, since decoding it needs an extra package.
+_SESSION = requests.Session()
+_SESSION.headers.update({'User-Agent': 'oct7-analyzer/1.0', 'Accept-Encoding': 'gzip, deflate'})
+_SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                       max_retries=Retry(total=3, backoff_factor=0.5)))
+
+# Separates the texts of the page elements, which are scanned as one string (HTML text cannot contain NUL)
+ELEMENT_SEPARATOR = '\0'
+
+# Sentence boundaries: whitespace after a sentence-ending punctuation mark, followed by the start of a new sentence,
+# or the separator between two elements (a sentence never spans two elements)
+SENT_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'])|' + ELEMENT_SEPARATOR)
+
+_MONTH_NUMBERS = {
+    name: number for number, name in enumerate(
+        ['January', 'February', 'March', 'April', 'May', 'June',
+         'July', 'August', 'September', 'October', 'November', 'December'], 1
+    )
+}
+
+_MONTH = f"(?:{'|'.join(_MONTH_NUMBERS)})"
+
+# The date formats to search for, fused into a single pattern so each sentence is scanned once:
+#   - Month Day, Year (e.g., "October 7, 2023")
+#   - Day Month Year (e.g., "7 October 2023"), whose Month Year part is captured as well, since it is also
+#     reported as a date of its own (e.g., "October 2023")
+#   - DD.MM.YYYY or DD-MM-YYYY or DD/MM/YYYY
+#   - Month Year (e.g., "October 2023")
+DATE_RE = re.compile(
+    rf'\b(?:{_MONTH}\s+\d{{1,2}},\s+\d{{4}}'
+    rf'|\d{{1,2}}\s+(?P<month_year>{_MONTH}\s+\d{{4}})'
+    rf'|\d{{1,2}}[./-]\d{{1,2}}[./-]\d{{4}}'
+    rf'|{_MONTH}\s+\d{{4}})\b'
+)
 
 
 def extract_wikipedia_dates(url):
@@ -21,13 +57,15 @@ def extract_wikipedia_dates(url):
     """
     # Fetch the Wikipedia page content
     print(f"Fetching content from {url}...")
-    response = requests.get(url)
+    response = _SESSION.get(url, timeout=30)
     if response.status_code != 200:
         print(f"Failed to retrieve the Wikipedia page. Status code: {response.status_code}")
         return []
 
-    # Parse the HTML content
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # Parse the HTML content with the (C-based) lxml parser, from the raw bytes so lxml detects the encoding itself.
+    # Only the main content is built into the tree, skipping the navigation, sidebar and footer markup.
+    only_content = SoupStrainer("div", id="mw-content-text")
+    soup = BeautifulSoup(response.content, 'lxml', parse_only=only_content)
 
     # Extract the main content of the page
     content = soup.find(id="mw-content-text")
@@ -35,10 +73,8 @@ def extract_wikipedia_dates(url):
         print("Failed to locate the main content of the page.")
         return []
 
-    # Extract the main article div
-    main_content = content.find("div", {"class": "mw-parser-output"})
-    if not main_content:
-        main_content = content  # Fallback
+    # Extract the main article div (falling back to the whole content)
+    main_content = content.select_one("div.mw-parser-output") or content
 
     # Remove non-relevant sections
     for elem in main_content.find_all(['div', 'table'],
@@ -48,58 +84,88 @@ def extract_wikipedia_dates(url):
     # Extract all text from paragraphs, list items, and headings
     text_elements = main_content.find_all(['p', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
 
-    # Define date patterns to search for
-    date_patterns = [
-        # Format: Month Day, Year (e.g., "October 7, 2023")
-        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},\s+\d{4}\b',
+    # Join the texts of all the elements, so the page is split into sentences and scanned for dates in one pass each
+    print("Analyzing text and extracting dates...")
+    # The text fragments are joined as-is: a separator (or stripping each fragment) would break dates
+    # split across tags, e.g. "<a>October 7</a>, 2023" or "<b>8</b>.10.2023"
+    texts = (element.get_text().strip() for element in text_elements)
+    date_contexts = collect_date_contexts(ELEMENT_SEPARATOR.join(text for text in texts if text))
+
+    # Convert dictionary to list of tuples, sorted chronologically. Only the distinct dates are parsed
+    # and sorted, and each date's contexts keep their order of appearance.
+    date_sentences = [
+        (date, context)
+        for date, contexts in sorted(date_contexts.items(), key=lambda item: date_sort_key(item[0]))
+        for context in contexts
+    ]
 
-        # Format: Day Month Year (e.g., "7 October 2023")
-        r'\b\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\b',
+    return date_sentences
 
-        # Format: DD.MM.YYYY or DD-MM-YYYY or DD/MM/YYYY
-        r'\b\d{1,2}[./-]\d{1,2}[./-]\d{4}\b',
 
-        # Format: Month Year (e.g., "October 2023")
-        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}\b'
-    ]
+def collect_date_contexts(full_text: str) -> Dict[str, List[str]]:
+    """
+    Find the dates in a text and the sentences they appear in. This is the hot loop of the extraction; it only
+    uses typed, pure-Python constructs, so it can be compiled as-is (e.g. with mypyc) if it ever needs to be.
 
-    # Store date contexts
-    date_contexts = {}
+    Args:
+        full_text (str): The texts of the page elements, joined by ELEMENT_SEPARATOR
 
-    # Process each text element
-    print("Analyzing text and extracting dates...")
-    for element in text_elements:
-        text = element.get_text().strip()
-        if not text:
-            continue
+    Returns:
+        dict: A mapping of each date to the distinct sentences containing it, in order of appearance
+    """
+    # Store date contexts (in order of appearance), and the same contexts as sets for constant-time duplicate checks
+    date_contexts: Dict[str, List[str]] = defaultdict(list)
+    seen_contexts: Dict[str, Set[str]] = defaultdict(set)
 
-        # Tokenize text into sentences
-        sentences = sent_tokenize(text)
+    # Split text into sentences, keeping the offset in full_text at which each of them starts
+    sentences: List[str] = SENT_SPLIT.split(full_text)
+    sentence_starts: List[int] = [0, *(boundary.end() for boundary in SENT_SPLIT.finditer(full_text))]
 
-        for sentence in sentences:
-            # Check each date pattern
-            for pattern in date_patterns:
-                matches = re.finditer(pattern, sentence)
-                for match in matches:
-                    date_str = match.group(0)
+    # Scan the whole text once for all the date patterns (a date never spans two sentences)
+    for match in DATE_RE.finditer(full_text):
+        # The sentence containing the match is the last one starting at or before it
+        sentence = sentences[bisect_right(sentence_starts, match.start()) - 1]
 
-                    # Store the date and context
-                    if date_str not in date_contexts:
-                        date_contexts[date_str] = []
+        for date_str in match.group(0, 'month_year'):
+            if date_str is None:
+                continue
 
-                    if sentence not in date_contexts[date_str]:
-                        date_contexts[date_str].append(sentence)
+            # Store the date and context (looking up its seen contexts once)
+            seen = seen_contexts[date_str]
+            if sentence not in seen:
+                seen.add(sentence)
+                date_contexts[date_str].append(sentence)
 
-    # Convert dictionary to list of tuples
-    date_sentences = []
-    for date, contexts in date_contexts.items():
-        for context in contexts:
-            date_sentences.append((date, context))
+    return date_contexts
 
-    # Sort by date string (alphabetical sort)
-    date_sentences.sort(key=lambda x: x[0])
 
-    return date_sentences
+def date_sort_key(date_str):
+    """
+    Convert a date matched by DATE_RE into a key that sorts the dates chronologically.
+
+    Args:
+        date_str (str): The date, in one of the DATE_RE formats (e.g. "October 7, 2023", "7 October 2023",
+            "7.10.2023" or "October 2023")
+
+    Returns:
+        tuple: (year, month, day, date_str); day is 0 for a Month Year date, so it sorts before the days of
+            its month, and date_str orders the different spellings of the same date
+    """
+    parts = re.findall(r'\d+|[A-Za-z]+', date_str)
+
+    if parts[0] in _MONTH_NUMBERS:
+        # Month Day, Year or Month Year
+        month = _MONTH_NUMBERS[parts[0]]
+        day = int(parts[1]) if len(parts) == 3 else 0
+    elif parts[1] in _MONTH_NUMBERS:
+        # Day Month Year
+        month = _MONTH_NUMBERS[parts[1]]
+        day = int(parts[0])
+    else:
+        # DD.MM.YYYY
+        day, month = int(parts[0]), int(parts[1])
+
+    return int(parts[-1]), month, day, date_str
 
 
 def write_to_csv(data, filename):
@@ -114,11 +180,11 @@ def write_to_csv(data, filename):
         str: Status message
     """
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+        # A large buffer flushes the rows in few writes, and writerows serializes them all in one call
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvfile:
             csv_writer = csv.writer(csvfile)
             csv_writer.writerow(['Date', 'Context'])
-            for date, sentence in data:
-                csv_writer.writerow([date, sentence])
+            csv_writer.writerows(data)
 
         return f"Data has been written to {filename}"
     except Exception as e:
@@ -3,6 +3,14 @@ import json
 import csv
 import os
 
+# The Wikipedia API client, created once with a user agent and shared by all calls, so its HTTP session
+# (and the connection it keeps alive) is reused between page fetches
+_WIKI = wikipediaapi.Wikipedia(
+    language='en',
+    extract_format=wikipediaapi.ExtractFormat.WIKI,
+    user_agent='oct7-analyzer/1.0'
+)
+
 
 def parse_wikipedia_titles_api(page_title):
     """
@@ -14,15 +22,8 @@ def parse_wikipedia_titles_api(page_title):
     Returns:
         dict: A dictionary with section information
     """
-    # Initialize the Wikipedia API with a user agent
-    wiki_wiki = wikipediaapi.Wikipedia(
-        language='en',
-        extract_format=wikipediaapi.ExtractFormat.WIKI,
-        user_agent='MyProject/1.0'
-    )
-
     # Get the page
-    page = wiki_wiki.page(page_title)
+    page = _WIKI.page(page_title)
 
     # Check if the page exists
     if not page.exists():
@@ -37,24 +38,22 @@ def parse_wikipedia_titles_api(page_title):
         "sections": []
     }
 
-    # Recursive function to extract section titles with their levels
-    def process_sections(sections, level=2):
-        section_list = []
-        for section in sections:
-            # Skip empty sections
-            if section.title:
-                section_info = {
-                    "title": section.title,
-                    "level": level
-                }
-                result["sections"].append(section_info)
-
-            # Process subsections (recursively)
-            if section.sections:
-                process_sections(section.sections, level + 1)
-
-    # Start processing from top-level sections
-    process_sections(page.sections)
+    # Extract the section titles with their levels in document order, walking the section tree
+    # with an explicit stack of (section, level) pairs, starting from the top-level sections
+    sections_append = result["sections"].append
+    stack = [(section, 2) for section in reversed(page.sections)]
+    while stack:
+        section, level = stack.pop()
+
+        # Skip empty sections
+        if section.title:
+            sections_append({
+                "title": section.title,
+                "level": level
+            })
+
+        # Process subsections next (reversed, so they are popped in order)
+        stack.extend((subsection, level + 1) for subsection in reversed(section.sections))
 
     return result
 
@@ -96,36 +95,22 @@ def save_to_csv(data, filename):
     if not filename.lower().endswith('.csv'):
         filename += '.csv'
 
-    # Prepare the data for CSV format (flattening the hierarchy)
-    csv_data = []
+    # Prepare the rows for CSV format (flattening the hierarchy), generated while they are written:
+    # the main title as the first row, then all sections
+    main_row = (1, data['main_title'], data['main_title'])
+    section_rows = (
+        # Create indented title for better readability in CSV
+        (section['level'], section['title'], "  " * (section['level'] - 2) + section['title'])
+        for section in data['sections']
+    )
 
-    # Add the main title as the first row
-    csv_data.append({
-        'level': 1,
-        'title': data['main_title'],
-        'indented_title': data['main_title']
-    })
+    # Write to CSV file, with a large buffer so the rows are flushed in few writes
+    with open(filename, 'w', encoding='utf-8', newline='', buffering=1 << 20) as f:
+        writer = csv.writer(f)
 
-    # Add all sections
-    for section in data['sections']:
-        # Create indented title for better readability in CSV
-        indent = "  " * (section['level'] - 2)
-        indented_title = f"{indent}{section['title']}"
-
-        csv_data.append({
-            'level': section['level'],
-            'title': section['title'],
-            'indented_title': indented_title
-        })
-
-    # Write to CSV file
-    with open(filename, 'w', encoding='utf-8', newline='') as f:
-        fieldnames = ['level', 'title', 'indented_title']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-        writer.writeheader()
-        for row in csv_data:
-            writer.writerow(row)
+        writer.writerow(['level', 'title', 'indented_title'])
+        writer.writerow(main_row)
+        writer.writerows(section_rows)
 
     return os.path.abspath(filename)
 